@@ -0,0 +1,235 @@
+"""
+Google Ads Account Metadata Cache.
+
+Account metadata barely changes: the customers the credentials can access,
+the manager/client hierarchy below the login (manager) account, and each
+account's name, currency and time zone. It is fetched once, kept in the
+shared cache backend for ACCOUNT_METADATA_TTL seconds, and refreshed in a
+background thread once it is older than ACCOUNT_METADATA_REFRESH_AFTER, so
+callers never wait on these lookups after the first fetch.
+
+Used by get_ads_performance (to pick a client account when CLIENT_CUSTOMER_ID
+is not configured), /api/google-ads/simple-test and list_customer_accounts.py.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from cache_backends import get_cache_backend
+from gaql_executor import execute_query
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Seconds account metadata is kept
+try:
+    from config import ACCOUNT_METADATA_TTL
+except ImportError:
+    ACCOUNT_METADATA_TTL = 24 * 3600
+
+# Age in seconds after which a read triggers a background refresh
+try:
+    from config import ACCOUNT_METADATA_REFRESH_AFTER
+except ImportError:
+    ACCOUNT_METADATA_REFRESH_AFTER = 3600
+
+NAMESPACE = 'account_metadata'
+
+CUSTOMER_QUERY = """
+    SELECT
+        customer.id,
+        customer.descriptive_name,
+        customer.currency_code,
+        customer.time_zone,
+        customer.manager
+    FROM customer
+    LIMIT 1
+"""
+
+HIERARCHY_QUERY = """
+    SELECT
+        customer_client.id,
+        customer_client.descriptive_name,
+        customer_client.currency_code,
+        customer_client.time_zone,
+        customer_client.manager,
+        customer_client.level
+    FROM customer_client
+    WHERE customer_client.level <= 1
+"""
+
+_refresh_lock = threading.Lock()
+_refreshing = set()
+
+def _customer_details(customer):
+    return {
+        'id': str(customer.id),
+        'descriptive_name': customer.descriptive_name if hasattr(customer, 'descriptive_name') else "N/A",
+        'currency_code': customer.currency_code if hasattr(customer, 'currency_code') else "N/A",
+        'time_zone': customer.time_zone if hasattr(customer, 'time_zone') else "N/A",
+        'manager': bool(getattr(customer, 'manager', False))
+    }
+
+def fetch_account_metadata(client):
+    """
+    Query the account metadata of the client's credentials from the API.
+
+    Args:
+        client (GoogleAdsClient): Google Ads API client
+
+    Returns:
+        dict: login_customer_id, accessible_customers (IDs in API order),
+            customers (ID -> id, descriptive_name, currency_code, time_zone,
+            manager), hierarchy (the login account and its direct clients) and fetched_at
+    """
+    login_customer_id = str(client.login_customer_id)
+
+    customer_service = client.get_service('CustomerService')
+    response = customer_service.list_accessible_customers()
+    accessible = [resource_name.split('/')[-1] for resource_name in response.resource_names]
+    logger.info(f"Found {len(accessible)} accessible customers")
+
+    # One query returns the login account (level 0) and its direct clients (level 1)
+    hierarchy = []
+    try:
+        for row in execute_query(client, login_customer_id, HIERARCHY_QUERY, label='account_hierarchy'):
+            client_account = row.customer_client
+            details = _customer_details(client_account)
+            details['level'] = client_account.level
+            details['manager_id'] = login_customer_id
+            hierarchy.append(details)
+    except Exception as e:
+        logger.warning(f"Could not get the account hierarchy of {login_customer_id}: {e}")
+
+    customers = {entry['id']: {key: entry[key] for key in ('id', 'descriptive_name', 'currency_code',
+                                                            'time_zone', 'manager')}
+                 for entry in hierarchy}
+
+    # Accessible accounts outside the hierarchy are queried one by one. These bypass the
+    # circuit breaker: a single account denying access is not an API outage.
+    ga_service = client.get_service('GoogleAdsService')
+    for customer_id in accessible:
+        if customer_id in customers:
+            continue
+        try:
+            for row in ga_service.search(customer_id=customer_id, query=CUSTOMER_QUERY):
+                customers[customer_id] = _customer_details(row.customer)
+        except Exception as e:
+            # Accessible but not queryable (e.g. cancelled accounts)
+            logger.warning(f"Could not get details of customer {customer_id}: {e}")
+            customers[customer_id] = {'id': customer_id, 'error': str(e)}
+
+    return {
+        'login_customer_id': login_customer_id,
+        'accessible_customers': accessible,
+        'customers': customers,
+        'hierarchy': hierarchy,
+        'fetched_at': time.time()
+    }
+
+def _refresh(client, key):
+    try:
+        metadata = fetch_account_metadata(client)
+        get_cache_backend().set(NAMESPACE, key, metadata, ACCOUNT_METADATA_TTL)
+        logger.info(f"Refreshed account metadata for {key}")
+    except Exception as e:
+        logger.error(f"Background refresh of account metadata for {key} failed: {e}")
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(key)
+
+def get_account_metadata(client=None, refresh=False):
+    """
+    Get the cached account metadata, fetching it on the first call.
+
+    Metadata older than ACCOUNT_METADATA_REFRESH_AFTER is returned as is
+    while a background thread re-fetches it.
+
+    Args:
+        client (GoogleAdsClient, optional): Google Ads API client. Defaults to
+            the pooled client.
+        refresh (bool, optional): Fetch from the API even if cached. Defaults to False.
+
+    Returns:
+        dict: See fetch_account_metadata
+        None: If no client is available or the fetch fails
+    """
+    if client is None:
+        from google_ads_client import get_google_ads_client
+        client = get_google_ads_client()
+        if not client:
+            logger.error("Failed to create Google Ads client for account metadata")
+            return None
+
+    key = str(client.login_customer_id)
+    backend = get_cache_backend()
+    metadata = None if refresh else backend.get(NAMESPACE, key)
+
+    if metadata is None:
+        try:
+            metadata = fetch_account_metadata(client)
+        except Exception as e:
+            logger.error(f"Error fetching account metadata: {e}")
+            return None
+        backend.set(NAMESPACE, key, metadata, ACCOUNT_METADATA_TTL)
+        return metadata
+
+    if time.time() - metadata['fetched_at'] >= ACCOUNT_METADATA_REFRESH_AFTER:
+        with _refresh_lock:
+            start = key not in _refreshing
+            _refreshing.add(key)
+        if start:
+            threading.Thread(target=_refresh, args=(client, key), name='account-metadata-refresh',
+                             daemon=True).start()
+    return metadata
+
+def get_default_client_account(client):
+    """
+    Pick the account to report on when CLIENT_CUSTOMER_ID is not configured.
+
+    Args:
+        client (GoogleAdsClient): Google Ads API client
+
+    Returns:
+        str: The first accessible non-manager account other than the login
+            account, or None if there is none
+    """
+    metadata = get_account_metadata(client)
+    if metadata is None:
+        return None
+
+    candidates = [customer_id for customer_id in metadata['accessible_customers']
+                  if customer_id != metadata['login_customer_id']]
+    # Prefer accounts known to be queryable client accounts, then fall back to API order
+    for customer_id in candidates:
+        if metadata['customers'].get(customer_id, {}).get('manager') is False:
+            return customer_id
+    return candidates[0] if candidates else None
+
+def get_customer_details(client, customer_id=None):
+    """
+    Get the cached name, currency and time zone of an account.
+
+    Args:
+        client (GoogleAdsClient): Google Ads API client
+        customer_id (str, optional): Account ID. Defaults to the login account.
+
+    Returns:
+        dict: Account details, or None if the account is not in the metadata
+    """
+    metadata = get_account_metadata(client)
+    if metadata is None:
+        return None
+
+    customer_id = str(customer_id or metadata['login_customer_id'])
+    details = metadata['customers'].get(customer_id)
+    if details is None:
+        details = next((entry for entry in metadata['hierarchy'] if entry['id'] == customer_id), None)
+    return details
+
+def fetched_at_iso(metadata):
+    """Format when metadata was fetched as an ISO 8601 UTC timestamp."""
+    return datetime.fromtimestamp(metadata['fetched_at'], timezone.utc).isoformat()
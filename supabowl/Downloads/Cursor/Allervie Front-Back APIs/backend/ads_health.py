@@ -0,0 +1,167 @@
+"""
+Google Ads API Health Prober.
+
+This module validates Google Ads API connectivity in a background thread
+and publishes the result as a cached status. Request handlers read the
+cached status instead of running a test query in the request path.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Probe interval in seconds
+try:
+    from config import ADS_HEALTH_PROBE_INTERVAL
+except ImportError:
+    ADS_HEALTH_PROBE_INTERVAL = 300
+
+PROBE_QUERY = """
+    SELECT customer.id
+    FROM customer
+    LIMIT 1
+"""
+
+class AdsHealthProber:
+    """
+    Periodically probes the Google Ads API and caches the result.
+
+    The degraded flag is a plain attribute so routes can check it in O(1)
+    without taking a lock.
+    """
+
+    def __init__(self, interval=ADS_HEALTH_PROBE_INTERVAL):
+        self.interval = interval
+        self.degraded = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._status = {
+            'status': 'unknown',
+            'degraded': False,
+            'last_checked': None,
+            'last_success': None,
+            'last_error': None,
+            'consecutive_failures': 0,
+            'latency_ms': None,
+            'customer_id': None,
+            'probe_interval': interval
+        }
+
+    def start(self):
+        """Start the background probe thread if it is not already running."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='ads-health-prober', daemon=True)
+            self._thread.start()
+        logger.info(f"Started Google Ads health prober (interval: {self.interval}s)")
+
+    def stop(self):
+        """Stop the background probe thread."""
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.probe_now()
+            self._stop_event.wait(self.interval)
+
+    def probe_now(self):
+        """
+        Run a single connectivity probe and publish the result.
+
+        Returns:
+            dict: The updated status
+        """
+        from google_ads_client import get_google_ads_client
+        from circuit_breaker import ads_circuit, is_outage_error
+
+        started = time.monotonic()
+        try:
+            client = get_google_ads_client()
+            if not client:
+                raise RuntimeError("Failed to create Google Ads client")
+
+            customer_id = client.login_customer_id
+            ga_service = client.get_service("GoogleAdsService")
+            try:
+                ga_service.search(customer_id=customer_id, query=PROBE_QUERY)
+            except Exception as query_error:
+                if is_outage_error(query_error):
+                    ads_circuit.record_failure(query_error)
+                raise
+            # A successful probe closes the circuit without waiting for user traffic
+            ads_circuit.record_success()
+            self._record_success(customer_id, time.monotonic() - started)
+        except Exception as e:
+            logger.error(f"Google Ads health probe failed: {e}")
+            self._record_failure(e, time.monotonic() - started)
+        return self.status()
+
+    def _record_success(self, customer_id, elapsed):
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._status.update({
+                'status': 'ok',
+                'degraded': False,
+                'last_checked': now,
+                'last_success': now,
+                'last_error': None,
+                'consecutive_failures': 0,
+                'latency_ms': round(elapsed * 1000, 1),
+                'customer_id': customer_id
+            })
+            self.degraded = False
+
+    def _record_failure(self, error, elapsed):
+        with self._lock:
+            self._status.update({
+                'status': 'degraded',
+                'degraded': True,
+                'last_checked': datetime.now().isoformat(),
+                'last_error': str(error),
+                'consecutive_failures': self._status['consecutive_failures'] + 1,
+                'latency_ms': round(elapsed * 1000, 1)
+            })
+            self.degraded = True
+
+    def status(self):
+        """
+        Get a copy of the cached health status.
+
+        Returns:
+            dict: Latest probe result
+        """
+        with self._lock:
+            return dict(self._status)
+
+# Process-wide prober shared by all request handlers
+health_prober = AdsHealthProber()
+
+def start_health_prober():
+    """Start the shared Google Ads health prober."""
+    health_prober.start()
+
+def is_ads_degraded():
+    """
+    Check whether the last Google Ads probe failed.
+
+    Returns:
+        bool: True if the Google Ads API is currently considered degraded
+    """
+    return health_prober.degraded
+
+def get_ads_health():
+    """
+    Get the cached Google Ads health status.
+
+    Returns:
+        dict: Latest probe result
+    """
+    return health_prober.status()
@@ -19,22 +19,29 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import pathlib
-from google_ads_client import get_ads_performance
-from extended_routes import extended_bp, AVAILABLE_ENDPOINTS  # Import our extended routes blueprint and available endpoints
+from google_ads_client import get_ads_performance, get_google_ads_client, resolve_api_version
+from extended_google_ads_api import get_campaign_performance, get_ad_group_performance
+from extended_routes import extended_bp, AVAILABLE_ENDPOINTS, circuit_open_response, fields_or_error  # Import our extended routes blueprint and available endpoints
+from ads_health import start_health_prober, get_ads_health, is_ads_degraded
+from circuit_breaker import get_circuit_status
+from account_metadata import get_account_metadata, get_customer_details, fetched_at_iso
+from cache_warmer import start_cache_warmer, get_warmup_status
+from result_cache import get_cache_stats, purge_results, pop_freshness
+from http_caching import (init_http_caching, freshness_headers, not_modified,
+                          compound_freshness_headers, compound_not_modified)
+from fact_store import get_daily_store
+from rollup_cube import get_cube_stats, purge_cubes
+from field_projection import project_row
+from logging_setup import configure_logging
+from json_provider import init_json_provider
+from compression import init_compression
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Import config
 from config import USE_REAL_ADS_CLIENT, ALLOW_MOCK_DATA, ALLOW_MOCK_AUTH, ENVIRONMENT
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
-)
+# Set up logging: records are written to a rotating app.log by a background thread
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -48,14 +55,31 @@ SCOPES = ['https://www.googleapis.com/auth/analytics.readonly']
 # Initialize Flask app
 app = Flask(__name__, template_folder='templates')
 app.wsgi_app = ProxyFix(app.wsgi_app)
+# orjson-backed app.json (standard library fallback) for jsonify and the NDJSON streams
+init_json_provider(app)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'allervie-dashboard-secret-key')
 app.config['SESSION_TYPE'] = 'filesystem'
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=1)
-CORS(app, supports_credentials=True)  # Enable CORS for all routes
+CORS(app, supports_credentials=True, expose_headers=['ETag', 'X-Data-As-Of', 'X-Data-Stale', 'X-Next-Cursor'])  # Enable CORS for all routes
 
 # Register our extended routes
 app.register_blueprint(extended_bp, url_prefix='/api/google-ads')
 
+# gzip/brotli compression; registered first so it runs after the ETag handling below
+init_compression(app)
+
+# ETag, Cache-Control and If-None-Match handling for all /api/ JSON responses
+init_http_caching(app)
+
+# Negotiate the Google Ads API version before the first request arrives
+resolve_api_version()
+
+# Validate Google Ads connectivity in the background instead of per request
+start_health_prober()
+
+# Pre-populate the caches for the dashboard's default date windows
+start_cache_warmer()
+
 # Create credentials directory if it doesn't exist
 CREDENTIALS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'credentials')
 os.makedirs(CREDENTIALS_DIR, exist_ok=True)
@@ -313,6 +337,29 @@ def dashboard_summary():
         ]
     })
 
+PERFORMANCE_METRICS = [
+    "impressions", "clicks", "conversions", "cost",
+    "conversionRate", "clickThroughRate", "costPerConversion"
+]
+
+def format_performance_data(performance_data):
+    """Shape get_ads_performance results for the API, with "N/A" for unavailable values"""
+    # Start with a template of all metrics as "N/A"
+    response_data = {metric: {"value": "N/A", "change": "N/A"} for metric in PERFORMANCE_METRICS}
+    
+    # Only update values that are available in the performance_data
+    for metric in PERFORMANCE_METRICS:
+        if metric in performance_data:
+            metric_data = performance_data[metric]
+            # Only set the value if it exists
+            if "value" in metric_data:
+                response_data[metric]["value"] = metric_data["value"]
+            # Only set the change if it exists
+            if "change" in metric_data:
+                response_data[metric]["change"] = metric_data["change"]
+    
+    return response_data
+
 @app.route('/api/google-ads/performance', methods=['GET'])
 def ads_performance():
     """Get Google Ads performance data from the Google Ads API
@@ -325,6 +372,8 @@ def ads_performance():
         start_date (str): Start date in YYYY-MM-DD format (defaults to 30 days ago)
         end_date (str): End date in YYYY-MM-DD format (defaults to yesterday)
         previous_period (bool): Whether to include previous period data for comparison
+        level (str): 'customer' for account totals (default) or 'campaign' to aggregate campaign rows
+        fields (str): Comma-separated metrics to return (defaults to all)
     
     Returns:
         JSON: Performance metrics with values and percentage changes
@@ -333,6 +382,7 @@ def ads_performance():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     previous_period = request.args.get('previous_period', 'false').lower() == 'true'
+    level = request.args.get('level', 'customer')
     
     # Verify authentication
     auth_header = request.headers.get('Authorization', '')
@@ -345,20 +395,42 @@ def ads_performance():
     # Extract token
     token = auth_header.split(' ')[1] if auth_header.startswith('Bearer ') else 'test-token'
     
+    fields, error_response = fields_or_error('performance')
+    if error_response:
+        return error_response
+    
     # Determine if we should use real data
     # We'll always try to use real data first
     logger.info(f"Getting Google Ads performance data for period: {start_date or 'default'} to {end_date or 'default'}")
     logger.info(f"Previous period comparison: {previous_period}")
     
+    # Answer If-None-Match from the result cache without fetching
+    cached_response = not_modified(get_ads_performance, start_date, end_date, previous_period, level)
+    if cached_response:
+        return cached_response
+    
     try:
         # Import the get_ads_performance function with fallback
         from google_ads_fallback import get_ads_performance_with_fallback
         
         # Get the performance data
         logger.info("Using Google Ads client with fallback to mock data if allowed")
-        performance_data = get_ads_performance_with_fallback(start_date, end_date, previous_period)
+        performance_data = get_ads_performance_with_fallback(start_date, end_date, previous_period, level)
         
         if not performance_data:
+            # Fail fast with the cached failure while the circuit breaker is open
+            circuit_response = circuit_open_response()
+            if circuit_response:
+                return circuit_response
+            
+            if is_ads_degraded():
+                logger.error("No performance data returned and the Google Ads API is degraded")
+                return jsonify({
+                    "error": "Google Ads API unavailable",
+                    "message": get_ads_health()['last_error'],
+                    "environment": ENVIRONMENT
+                }), 503
+            
             logger.error("No performance data returned from Google Ads API and mock data is disabled")
             return jsonify({
                 "error": "No data available",
@@ -368,58 +440,10 @@ def ads_performance():
         
         logger.info(f"Successfully retrieved Google Ads performance data")
         
-        # Format the response to match expected structure - display "N/A" for unavailable data
-        # Start with a template of all metrics as "N/A"
-        response_data = {
-            "impressions": {
-                "value": "N/A",
-                "change": "N/A"
-            },
-            "clicks": {
-                "value": "N/A",
-                "change": "N/A"
-            },
-            "conversions": {
-                "value": "N/A",
-                "change": "N/A"
-            },
-            "cost": {
-                "value": "N/A",
-                "change": "N/A"
-            },
-            "conversionRate": {
-                "value": "N/A",
-                "change": "N/A"
-            },
-            "clickThroughRate": {
-                "value": "N/A",
-                "change": "N/A"
-            },
-            "costPerConversion": {
-                "value": "N/A",
-                "change": "N/A"
-            }
-        }
-        
-        # Only update values that are available in the performance_data
-        # Use a list to iterate through all metrics
-        metrics = [
-            "impressions", "clicks", "conversions", "cost", 
-            "conversionRate", "clickThroughRate", "costPerConversion"
-        ]
-        
-        for metric in metrics:
-            # Check if this metric exists in performance_data
-            if metric in performance_data:
-                metric_data = performance_data[metric]
-                # Only set the value if it exists
-                if "value" in metric_data:
-                    response_data[metric]["value"] = metric_data["value"]
-                # Only set the change if it exists
-                if "change" in metric_data:
-                    response_data[metric]["change"] = metric_data["change"]
+        response_data = project_row(format_performance_data(performance_data), fields)
         
-        return jsonify(response_data)
+        # ETag plus X-Data-As-Of / X-Data-Stale telling the dashboard how fresh the served result is
+        return jsonify(response_data), 200, freshness_headers()
         
     except Exception as e:
         logger.error(f"Error fetching Google Ads performance data: {str(e)}")
@@ -433,6 +457,104 @@ def ads_performance():
             "help": "Please verify your Google Ads API credentials and ensure the API is properly configured."
         }), 500
 
+@app.route('/api/google-ads/dashboard', methods=['GET'])
+def ads_dashboard_data():
+    """Get every panel of the ads dashboard in one response
+    
+    Returns the KPIs with the previous-period comparison, campaigns and ad groups
+    for one date range. The KPI fetch runs first and syncs the campaign and ad
+    group x day rows of the whole window (current and previous period); campaigns
+    and ad groups are then rolled up from the same cube without further API queries.
+    
+    Query Parameters:
+        start_date (str): Start date in YYYY-MM-DD format. Defaults to 30 days before end_date.
+        end_date (str): End date in YYYY-MM-DD format. Defaults to today.
+    
+    Returns:
+        JSON: performance, campaigns and adGroups (null for a panel that failed)
+            plus errors per failed panel
+    """
+    # Verify authentication
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer ') and 'user_id' not in session:
+        logger.warning("Unauthorized request to Google Ads dashboard endpoint")
+        return jsonify({"error": "Unauthorized", "message": "Authentication required"}), 401
+    
+    # Resolve the defaults here: each fetch function has its own, and the panels
+    # must cover the same window. This is the window ads_dashboard.html and the
+    # cache warmer use, so a dateless request hits warm cache entries.
+    end_date = request.args.get('end_date') or datetime.now().date().strftime('%Y-%m-%d')
+    start_date = request.args.get('start_date')
+    if not start_date:
+        try:
+            start_date = (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=30)).strftime('%Y-%m-%d')
+        except ValueError:
+            return jsonify({
+                "error": "Invalid parameters",
+                "message": f"Invalid end_date: {end_date}. Must be YYYY-MM-DD",
+                "environment": ENVIRONMENT
+            }), 400
+    logger.info(f"Getting Google Ads dashboard data for period: {start_date} to {end_date}")
+    
+    # Arguments match the individual routes, so the panels share their cache entries
+    panel_calls = [
+        (get_ads_performance, (start_date, end_date, True, 'customer'), {}),
+        (get_campaign_performance, (None,), {'start_date': start_date, 'end_date': end_date}),
+        (get_ad_group_performance, (None,), {'start_date': start_date, 'end_date': end_date})
+    ]
+    
+    # Answer If-None-Match when every panel is fresh in the result cache
+    cached_response = compound_not_modified(*panel_calls)
+    if cached_response:
+        return cached_response
+    
+    data = {'performance': None, 'campaigns': None, 'adGroups': None}
+    errors = {}
+    freshnesses = []
+    
+    # Run in the request thread and in this order: KPIs sync the widest window first
+    try:
+        performance_data = get_ads_performance(start_date, end_date, True, 'customer')
+        freshnesses.append(pop_freshness())
+        if performance_data:
+            data['performance'] = format_performance_data(performance_data)
+        else:
+            errors['performance'] = "No performance data returned from Google Ads API"
+        
+        client = get_google_ads_client()
+        for name, fetch_fn in (('campaigns', get_campaign_performance), ('adGroups', get_ad_group_performance)):
+            panel_data = fetch_fn(client, start_date=start_date, end_date=end_date)
+            freshnesses.append(pop_freshness())
+            if panel_data is not None:
+                data[name] = panel_data
+            else:
+                errors[name] = f"No {name} data returned from Google Ads API"
+    except Exception as e:
+        logger.error(f"Error fetching Google Ads dashboard data: {str(e)}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return jsonify({
+            "error": "Failed to retrieve Google Ads dashboard data",
+            "message": str(e),
+            "environment": ENVIRONMENT
+        }), 500
+    
+    if all(value is None for value in data.values()):
+        # Fail fast with the cached failure while the circuit breaker is open
+        circuit_response = circuit_open_response()
+        if circuit_response:
+            return circuit_response
+        
+        logger.error("No dashboard data returned from Google Ads API")
+        return jsonify({
+            "error": "No data available",
+            "message": "Failed to retrieve Google Ads dashboard data",
+            "environment": ENVIRONMENT
+        }), 404
+    
+    data['errors'] = errors
+    return jsonify(data), 200, compound_freshness_headers(freshnesses)
+
 @app.route('/api/form-performance', methods=['GET'])
 def form_performance():
     """Get form performance data"""
@@ -525,9 +647,45 @@ def health_check():
         'service': 'Allervie Analytics API',
         'environment': ENVIRONMENT,
         'version': '1.0.0',
-        'apiAvailable': True
+        'apiAvailable': not is_ads_degraded(),
+        'googleAds': get_ads_health(),
+        'circuit': get_circuit_status(),
+        'cacheWarmup': get_warmup_status()
     })
 
+@app.route('/api/admin/cache', methods=['GET', 'DELETE'])
+def admin_result_cache():
+    """Get result cache statistics (GET) or purge cached results (DELETE)
+
+    DELETE accepts an optional `endpoint` query parameter (e.g. campaign_performance)
+    to purge only that endpoint's results. Without it, the daily metrics store and
+    the rollup cubes built from it are purged as well.
+    """
+    # Check for authentication
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer ') and 'user_id' not in session:
+        logger.warning("Unauthorized access attempt to admin cache endpoint")
+        return jsonify({"error": "Unauthorized"}), 401
+
+    if request.method == 'DELETE':
+        endpoint = request.args.get('endpoint')
+        purged = purge_results(endpoint)
+        purged_days = 0
+        if not endpoint:
+            purged_days = get_daily_store().purge()
+            purge_cubes()
+        return jsonify({
+            'status': 'success',
+            'purged': purged,
+            'purgedDays': purged_days,
+            'endpoint': endpoint or 'all'
+        })
+
+    stats = get_cache_stats()
+    stats['dailyStore'] = get_daily_store().stats()
+    stats['rollupCubes'] = get_cube_stats()
+    return jsonify(stats)
+
 @app.route('/api/endpoints', methods=['GET'])
 def list_endpoints():
     """List all available API endpoints for testing purposes
@@ -599,56 +757,29 @@ def test_google_ads_connection():
     """Test the Google Ads API connection"""
     logger.info("Testing Google Ads API connection")
     
-    try:
-        # Import the Google Ads client
-        from google_ads_client import get_google_ads_client
-        
-        # Get the client
-        client = get_google_ads_client()
-        
-        if not client:
-            return jsonify({
-                'status': 'error',
-                'message': 'Failed to create Google Ads client'
-            }), 500
-        
-        # Get customer ID from client
-        customer_id = client.login_customer_id
-        
-        # Try a simple query to test the connection
-        ga_service = client.get_service("GoogleAdsService")
-        
-        # Create a simple query
-        query = """
-            SELECT 
-                customer.id
-            FROM customer
-            LIMIT 1
-        """
-        
-        # Execute the query
-        search_request = client.get_type("SearchGoogleAdsRequest")
-        search_request.customer_id = customer_id
-        search_request.query = query
-        
-        response = ga_service.search(request=search_request)
-        
-        # If we get here, the connection works
+    # Report the cached result of the background health prober
+    health = get_ads_health()
+    
+    if health['status'] == 'unknown':
         return jsonify({
-            'status': 'success',
-            'message': 'Google Ads API connection successful',
-            'customer_id': customer_id
-        })
-    except Exception as e:
-        logger.error(f"Error testing Google Ads API connection: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        
+            'status': 'pending',
+            'message': 'Google Ads API connection has not been probed yet',
+            'health': health
+        }), 503
+    
+    if health['degraded']:
         return jsonify({
             'status': 'error',
-            'message': f'Google Ads API connection failed: {str(e)}',
-            'traceback': traceback.format_exc()
+            'message': f"Google Ads API connection failed: {health['last_error']}",
+            'health': health
         }), 500
+    
+    return jsonify({
+        'status': 'success',
+        'message': 'Google Ads API connection successful',
+        'customer_id': health['customer_id'],
+        'health': health
+    })
 
 @app.route('/api/google-ads/simple-test', methods=['GET'])
 def simple_google_ads_test():
@@ -696,51 +827,18 @@ def simple_google_ads_test():
                     service_name = attr[4:]  # Remove 'get_' prefix
                     available_services.append(service_name)
             
-            # Try a simple query
-            try:
-                customer_id = client.login_customer_id
-                
-                # Try a simple query with v17 syntax
-                query = f"""
-                SELECT 
-                  customer.id,
-                  customer.descriptive_name,
-                  customer.currency_code,
-                  customer.time_zone
-                FROM customer
-                LIMIT 1
-                """
-                
-                # Execute the query
-                try:
-                    response = ga_service.search(
-                        customer_id=customer_id,
-                        query=query
-                    )
-                    
-                    # Process the results
-                    customer_details = {}
-                    for row in response:
-                        customer = row.customer
-                        customer_details = {
-                            "id": customer.id,
-                            "descriptive_name": customer.descriptive_name if hasattr(customer, "descriptive_name") else "N/A",
-                            "currency_code": customer.currency_code if hasattr(customer, "currency_code") else "N/A",
-                            "time_zone": customer.time_zone if hasattr(customer, "time_zone") else "N/A"
-                        }
-                        break  # Just get the first one
-                    
-                    if customer_details:
-                        query_status = "Successfully retrieved customer details"
-                    else:
-                        customer_details = {"id": customer_id}
-                        query_status = "Query executed but no customer details found"
-                except Exception as search_error:
-                    customer_details = {"id": customer_id}
-                    query_status = f"Error executing search query: {str(search_error)}"
-            except Exception as query_error:
+            # Customer details come from the account metadata cache instead of a query per request
+            customer_id = client.login_customer_id
+            metadata = get_account_metadata(client)
+            customer_details = get_customer_details(client, customer_id) if metadata else None
+            if customer_details:
+                query_status = f"Retrieved customer details from the account metadata cache (fetched at {fetched_at_iso(metadata)})"
+            elif metadata:
+                customer_details = {"id": customer_id}
+                query_status = "Account metadata cached but no customer details found"
+            else:
                 customer_details = {"id": customer_id}
-                query_status = f"Error setting up query: {str(query_error)}"
+                query_status = "Error fetching account metadata"
             
             # Get account information from the config
             account_info = {
@@ -10,9 +10,8 @@ import logging
 from pathlib import Path
 import json
 from flask import current_app
-from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
-from google_ads_client import get_google_ads_client  # Import the centralized client initialization
+from google_ads_client import get_google_ads_client as get_pooled_google_ads_client, invalidate_google_ads_client  # Import the centralized client registry
 
 # Import the smart token manager
 from smart_token_manager import verify_ads_token
@@ -28,7 +27,7 @@ def get_google_ads_client(force_token_refresh=False):
     This function:
     1. Verifies token validity before creating the client
     2. Refreshes the token if necessary using the smart token manager
-    3. Returns a fully configured Google Ads client
+    3. Returns the pooled Google Ads client from the process-wide registry
     
     Args:
         force_token_refresh (bool): Force refresh of the token regardless of validity
@@ -43,19 +42,15 @@ def get_google_ads_client(force_token_refresh=False):
             logger.error("Failed to verify Google Ads API token")
             return None
         
-        # Get credentials file path
-        credentials_path = Path(__file__).parent.parent / "credentials" / "google-ads.yaml"
+        # A forced refresh rotates credentials, so pooled clients must be rebuilt
+        if force_token_refresh:
+            invalidate_google_ads_client()
         
-        if not credentials_path.exists():
-            logger.error(f"Google Ads YAML configuration file not found at {credentials_path}")
+        client = get_pooled_google_ads_client()
+        if not client:
+            logger.error("Pooled Google Ads client is not available")
             return None
         
-        logger.info(f"Loading Google Ads client from {credentials_path}")
-        
-        # Create the client
-        client = GoogleAdsClient.load_from_storage(str(credentials_path))
-        logger.info("Successfully loaded Google Ads client")
-        
         return client
     
     except Exception as e:
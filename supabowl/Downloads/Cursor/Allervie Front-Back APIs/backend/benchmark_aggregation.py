@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Aggregation Micro-Benchmark
+
+This script compares the keyed (hash-indexed) aggregation used by
+extended_google_ads_api with the previous linear-scan aggregation on
+synthetic search term rows. Each search term is split into one row per
+day, as it is once segments.date is selected.
+
+Usage:
+    python benchmark_aggregation.py
+    python benchmark_aggregation.py --days 30 --max-linear-rows 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from ads_aggregation import KeyedAccumulator, metric_fields, merge_metrics
+
+ROW_COUNTS = [1_000, 10_000, 100_000, 1_000_000]
+
+def generate_rows(row_count, days):
+    """Generate synthetic (search term, campaign ID, ad group ID, metrics) rows."""
+    term_count = max(1, row_count // days)
+    rng = random.Random(42)
+    rows = []
+    for i in range(row_count):
+        term_index = i % term_count
+        impressions = rng.randint(0, 500)
+        clicks = rng.randint(0, impressions // 10 + 1)
+        metrics = SimpleNamespace(
+            impressions=impressions,
+            clicks=clicks,
+            cost_micros=clicks * rng.randint(100000, 3000000),
+            ctr=clicks / impressions if impressions else 0.0
+        )
+        rows.append((f"term {term_index}", str(term_index % 50), str(term_index % 400), metrics))
+    return rows
+
+def aggregate_linear(rows):
+    """The previous aggregation: a next() scan over all entries for every row."""
+    search_terms = []
+    for search_term, campaign_id, ad_group_id, metrics in rows:
+        existing_term = next((st for st in search_terms if st['search_term'] == search_term and
+                              st['campaign_id'] == campaign_id and
+                              st['ad_group_id'] == ad_group_id), None)
+        if existing_term:
+            merge_metrics(existing_term, metrics)
+        else:
+            new_term = {'search_term': search_term, 'campaign_id': campaign_id, 'ad_group_id': ad_group_id}
+            new_term.update(metric_fields(metrics))
+            search_terms.append(new_term)
+    return search_terms
+
+def aggregate_keyed(rows):
+    """The current aggregation: a dict lookup per row."""
+    accumulator = KeyedAccumulator()
+    for search_term, campaign_id, ad_group_id, metrics in rows:
+        accumulator.add(
+            (search_term, campaign_id, ad_group_id),
+            metrics,
+            lambda: {'search_term': search_term, 'campaign_id': campaign_id, 'ad_group_id': ad_group_id}
+        )
+    return accumulator.values()
+
+def time_call(fn, rows):
+    started = time.perf_counter()
+    result = fn(rows)
+    return time.perf_counter() - started, result
+
+def main():
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description='Benchmark Google Ads row aggregation')
+    parser.add_argument('--days', type=int, default=30, help='Rows per search term (days in the range)')
+    parser.add_argument('--max-linear-rows', type=int, default=20_000,
+                        help='Skip the linear scan above this many rows (it is quadratic)')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'entities':>10} {'keyed (s)':>12} {'linear (s)':>12} {'speedup':>10}")
+    print("-" * 58)
+
+    for row_count in ROW_COUNTS:
+        rows = generate_rows(row_count, args.days)
+        keyed_time, keyed_result = time_call(aggregate_keyed, rows)
+
+        if row_count <= args.max_linear_rows:
+            linear_time, linear_result = time_call(aggregate_linear, rows)
+            if linear_result != keyed_result:
+                print(f"❌ Results differ at {row_count} rows")
+                return 1
+            linear_column = f"{linear_time:12.3f}"
+            speedup_column = f"{linear_time / keyed_time:9.1f}x"
+        else:
+            linear_column = f"{'skipped':>12}"
+            speedup_column = f"{'-':>10}"
+
+        print(f"{row_count:>10} {len(keyed_result):>10} {keyed_time:12.3f} {linear_column} {speedup_column}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""
+Pluggable Cache Backends.
+
+The result cache, token verification cache and account metadata cache store
+their entries through a CacheBackend:
+
+- MemoryCacheBackend keeps entries in the current process (fast, but each
+  WSGI worker has its own copy and it is cold after a restart).
+- SQLiteCacheBackend keeps entries in a SQLite database in WAL mode, shared
+  by every worker process on the host and kept across restarts.
+
+Both enforce a byte budget with least-recently-used eviction. Entries are
+grouped into namespaces (e.g. one per endpoint) for purging and statistics.
+CACHE_BACKEND selects the process-wide backend returned by get_cache_backend().
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 'sqlite' (shared by all workers, survives restarts) or 'memory' (per process)
+try:
+    from config import CACHE_BACKEND
+except ImportError:
+    CACHE_BACKEND = 'sqlite'
+
+# Location of the SQLite cache database
+try:
+    from config import CACHE_BACKEND_PATH
+except ImportError:
+    CACHE_BACKEND_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache.db')
+
+# Total size of cached values, measured as serialized JSON
+try:
+    from config import CACHE_MAX_BYTES
+except ImportError:
+    CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Seconds between recorded accesses of a SQLite entry. Recording an access is a
+# write, and SQLite has one writer at a time across all workers, so hits only
+# refresh last_access when it is older than this; LRU order is this coarse.
+try:
+    from config import CACHE_ACCESS_RESOLUTION
+except ImportError:
+    CACHE_ACCESS_RESOLUTION = 60
+
+def _serialize(value):
+    return json.dumps(value, default=str, sort_keys=True)
+
+class CacheBackend:
+    """
+    Interface of a key-value store with per-entry TTLs.
+
+    Values must be JSON-serializable. Keys are strings unique within a namespace.
+    """
+
+    def get(self, namespace, key):
+        """
+        Get a value.
+
+        Returns:
+            The stored value, or None if it is missing or expired
+        """
+        raise NotImplementedError
+
+    def set(self, namespace, key, value, ttl, size=None):
+        """
+        Store a value for ttl seconds.
+
+        Args:
+            namespace (str): Group the entry belongs to
+            key (str): Key within the namespace
+            value: JSON-serializable value
+            ttl (float): Seconds until the entry expires
+            size (int, optional): Size in bytes if already known. Defaults to
+                the length of the value's JSON serialization.
+        """
+        raise NotImplementedError
+
+    def delete(self, namespace, key):
+        """Remove a value if present."""
+        raise NotImplementedError
+
+    def purge(self, namespace=None):
+        """
+        Remove every entry, or every entry of one namespace.
+
+        Returns:
+            int: Number of entries removed
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Get backend statistics.
+
+        Returns:
+            dict: Entry and byte totals, budget, evictions and entries per namespace
+        """
+        raise NotImplementedError
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process backend: an OrderedDict in least-recently-used order."""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+
+    def _remove(self, entry_key):
+        _, size, _ = self._entries.pop(entry_key)
+        self._bytes -= size
+
+    def get(self, namespace, key):
+        entry_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                return None
+            if entry[2] <= time.time():
+                self._remove(entry_key)
+                return None
+            self._entries.move_to_end(entry_key)
+            return entry[0]
+
+    def set(self, namespace, key, value, ttl, size=None):
+        if size is None:
+            size = len(_serialize(value))
+        if size > self.max_bytes:
+            logger.warning(f"Value for {namespace} ({size} bytes) exceeds the cache budget, not caching")
+            return
+
+        entry_key = (namespace, key)
+        with self._lock:
+            if entry_key in self._entries:
+                self._remove(entry_key)
+            self._entries[entry_key] = (value, size, time.time() + ttl)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def delete(self, namespace, key):
+        with self._lock:
+            if (namespace, key) in self._entries:
+                self._remove((namespace, key))
+
+    def purge(self, namespace=None):
+        with self._lock:
+            keys = [entry_key for entry_key in self._entries if namespace is None or entry_key[0] == namespace]
+            for entry_key in keys:
+                self._remove(entry_key)
+        return len(keys)
+
+    def stats(self):
+        with self._lock:
+            namespaces = {}
+            for namespace, _ in self._entries:
+                namespaces[namespace] = namespaces.get(namespace, 0) + 1
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self._evictions,
+                'namespaces': namespaces
+            }
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Multi-process backend stored in SQLite (WAL mode).
+
+    Each thread of each process opens its own connection; SQLite's locking
+    serializes writers across processes. The total size of all entries is
+    kept in cache_totals by triggers, so eviction does not scan the table.
+    """
+
+    def __init__(self, path=CACHE_BACKEND_PATH, max_bytes=CACHE_MAX_BYTES,
+                 access_resolution=CACHE_ACCESS_RESOLUTION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.access_resolution = access_resolution
+        self._local = threading.local()
+        self._evictions = 0
+
+    def _connection(self):
+        """Get this thread's connection, reconnecting after a fork."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_cache_entries_last_access ON cache_entries (last_access);
+                CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries (expires_at);
+
+                BEGIN IMMEDIATE;
+                CREATE TABLE IF NOT EXISTS cache_totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    bytes INTEGER NOT NULL
+                );
+                -- Databases created before the totals table start from the current sum
+                INSERT OR IGNORE INTO cache_totals (id, bytes)
+                    SELECT 1, COALESCE(SUM(size), 0) FROM cache_entries;
+                CREATE TRIGGER IF NOT EXISTS cache_entries_insert_size AFTER INSERT ON cache_entries
+                BEGIN
+                    UPDATE cache_totals SET bytes = bytes + new.size WHERE id = 1;
+                END;
+                CREATE TRIGGER IF NOT EXISTS cache_entries_update_size AFTER UPDATE OF size ON cache_entries
+                BEGIN
+                    UPDATE cache_totals SET bytes = bytes - old.size + new.size WHERE id = 1;
+                END;
+                CREATE TRIGGER IF NOT EXISTS cache_entries_delete_size AFTER DELETE ON cache_entries
+                BEGIN
+                    UPDATE cache_totals SET bytes = bytes - old.size WHERE id = 1;
+                END;
+                COMMIT;
+            """)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, namespace, key):
+        connection = self._connection()
+        now = time.time()
+        row = connection.execute(
+            "SELECT value, last_access FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        if now - row[1] >= self.access_resolution:
+            with connection:
+                connection.execute(
+                    "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                    (now, namespace, key)
+                )
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl, size=None):
+        serialized = _serialize(value)
+        size = len(serialized)
+        if size > self.max_bytes:
+            logger.warning(f"Value for {namespace} ({size} bytes) exceeds the cache budget, not caching")
+            return
+
+        connection = self._connection()
+        now = time.time()
+        with connection:
+            # An upsert rather than INSERT OR REPLACE: the implicit delete of a
+            # REPLACE does not fire the delete trigger that maintains cache_totals
+            connection.execute(
+                "INSERT INTO cache_entries (namespace, key, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "expires_at = excluded.expires_at, last_access = excluded.last_access",
+                (namespace, key, serialized, size, now + ttl, now)
+            )
+            self._evict(connection, now)
+
+    def _evict(self, connection, now):
+        """Drop expired entries, then least recently used ones until within budget."""
+        connection.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+        total = connection.execute("SELECT bytes FROM cache_totals WHERE id = 1").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for namespace, key, size in connection.execute(
+                "SELECT namespace, key, size FROM cache_entries ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((namespace, key))
+            total -= size
+        connection.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", evicted)
+        self._evictions += len(evicted)
+
+    def delete(self, namespace, key):
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def purge(self, namespace=None):
+        connection = self._connection()
+        with connection:
+            if namespace is None:
+                return connection.execute("DELETE FROM cache_entries").rowcount
+            return connection.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,)).rowcount
+
+    def stats(self):
+        connection = self._connection()
+        namespaces = {}
+        entries, total = 0, 0
+        for namespace, count, size in connection.execute(
+                "SELECT namespace, COUNT(*), SUM(size) FROM cache_entries WHERE expires_at > ? GROUP BY namespace",
+                (time.time(),)):
+            namespaces[namespace] = count
+            entries += count
+            total += size
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'evictions': self._evictions,
+            'namespaces': namespaces
+        }
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_cache_backend():
+    """
+    Get the process-wide cache backend selected by CACHE_BACKEND.
+
+    Falls back to MemoryCacheBackend if the SQLite database cannot be opened.
+
+    Returns:
+        CacheBackend: The shared backend
+    """
+    global _backend
+
+    with _backend_lock:
+        if _backend is None:
+            if CACHE_BACKEND == 'sqlite':
+                try:
+                    _backend = SQLiteCacheBackend()
+                    _backend.stats()
+                    logger.info(f"Using SQLite cache backend at {_backend.path}")
+                except sqlite3.Error as e:
+                    logger.error(f"Could not open SQLite cache backend, using memory: {e}")
+                    _backend = MemoryCacheBackend()
+            else:
+                _backend = MemoryCacheBackend()
+        return _backend
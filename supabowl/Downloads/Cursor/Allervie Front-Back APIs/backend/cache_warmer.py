@@ -0,0 +1,169 @@
+"""
+Startup Cache Warming.
+
+ads_dashboard.html opens with a default date window and immediately calls
+/performance, /campaigns and /ad_groups. Right after a deploy the first
+visitor would pay for a cold Google Ads client, an OAuth token refresh and
+cold GAQL queries. The warmer runs those fetches once at startup so the
+result cache (shared by all workers through the cache backend) already holds
+the default windows, including the previous-period comparison.
+
+Timing for each step is logged and reported through get_warmup_status(),
+which /api/health includes.
+"""
+
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Warm the caches when the app starts
+try:
+    from config import CACHE_WARM_ON_STARTUP
+except ImportError:
+    CACHE_WARM_ON_STARTUP = True
+
+# Block startup until warming finishes (otherwise it runs in a background thread
+# while the app already accepts traffic; concurrent requests join the same fetches)
+try:
+    from config import CACHE_WARM_BLOCKING
+except ImportError:
+    CACHE_WARM_BLOCKING = False
+
+# Windows to warm, in days back from today (the dashboard defaults to 30)
+try:
+    from config import CACHE_WARM_WINDOWS
+except ImportError:
+    CACHE_WARM_WINDOWS = [30]
+
+_status_lock = threading.Lock()
+_status = {
+    'status': 'pending' if CACHE_WARM_ON_STARTUP else 'disabled',
+    'started_at': None,
+    'finished_at': None,
+    'duration_seconds': None,
+    'steps': []
+}
+
+def _warm_windows():
+    """Yield (days, start_date, end_date) for each configured window, as the dashboard sends them."""
+    today = date.today()
+    for days in CACHE_WARM_WINDOWS:
+        yield days, (today - timedelta(days=days)).isoformat(), today.isoformat()
+
+def default_warm_steps():
+    """
+    Build the warm-up steps for the default dashboard windows.
+
+    Returns:
+        list: (name, callable) pairs
+    """
+    from google_ads_client import get_google_ads_client, get_ads_performance
+    from extended_google_ads_api import get_campaign_performance, get_ad_group_performance
+
+    from account_metadata import get_account_metadata
+
+    steps = [
+        ('google_ads_client', get_google_ads_client),
+        # Needed before the performance steps when CLIENT_CUSTOMER_ID is not configured
+        ('account_metadata', get_account_metadata),
+    ]
+
+    for days, start_date, end_date in _warm_windows():
+        # Arguments match what the routes pass, so the cache keys match too
+        steps.extend([
+            (f'performance_{days}d',
+             lambda s=start_date, e=end_date: get_ads_performance(s, e, False, 'customer')),
+            (f'performance_{days}d_previous_period',
+             lambda s=start_date, e=end_date: get_ads_performance(s, e, True, 'customer')),
+            (f'campaigns_{days}d',
+             lambda s=start_date, e=end_date: get_campaign_performance(get_google_ads_client(), start_date=s, end_date=e)),
+            (f'ad_groups_{days}d',
+             lambda s=start_date, e=end_date: get_ad_group_performance(get_google_ads_client(), start_date=s, end_date=e)),
+        ])
+
+    return steps
+
+def warm_caches():
+    """
+    Run every warm-up step in order and record its timing.
+
+    Returns:
+        dict: The warm-up status (see get_warmup_status)
+    """
+    started = time.monotonic()
+    with _status_lock:
+        _status.update({
+            'status': 'running',
+            'started_at': datetime.now().isoformat(),
+            'finished_at': None,
+            'duration_seconds': None,
+            'steps': []
+        })
+    logger.info("Cache warm-up started")
+
+    failures = 0
+    try:
+        steps = default_warm_steps()
+    except ImportError as e:
+        logger.error(f"Cache warm-up could not load the Google Ads fetch functions: {e}")
+        steps = []
+        failures += 1
+
+    for name, fn in steps:
+        step_started = time.monotonic()
+        error = None
+        try:
+            if fn() is None:
+                error = "No data returned"
+        except Exception as e:
+            error = str(e)
+        duration = round(time.monotonic() - step_started, 3)
+
+        if error:
+            failures += 1
+            logger.warning(f"Cache warm-up step {name} failed after {duration}s: {error}")
+        else:
+            logger.info(f"Cache warm-up step {name} took {duration}s")
+
+        with _status_lock:
+            _status['steps'].append({'name': name, 'ok': error is None, 'duration_seconds': duration, 'error': error})
+
+    duration = round(time.monotonic() - started, 3)
+    with _status_lock:
+        _status.update({
+            'status': 'completed' if failures == 0 else 'completed_with_errors',
+            'finished_at': datetime.now().isoformat(),
+            'duration_seconds': duration
+        })
+    logger.info(f"Cache warm-up finished in {duration}s with {failures} failed step(s)")
+    return get_warmup_status()
+
+def start_cache_warmer():
+    """
+    Warm the caches at startup if CACHE_WARM_ON_STARTUP is enabled.
+
+    Runs in a daemon thread unless CACHE_WARM_BLOCKING is set.
+    """
+    if not CACHE_WARM_ON_STARTUP:
+        logger.info("Cache warm-up disabled")
+        return
+
+    if CACHE_WARM_BLOCKING:
+        warm_caches()
+    else:
+        threading.Thread(target=warm_caches, name='cache-warmer', daemon=True).start()
+
+def get_warmup_status():
+    """
+    Get the state and timing of the startup warm-up.
+
+    Returns:
+        dict: status, started_at, finished_at, duration_seconds and per-step timings
+    """
+    with _status_lock:
+        return {**_status, 'steps': [dict(step) for step in _status['steps']]}
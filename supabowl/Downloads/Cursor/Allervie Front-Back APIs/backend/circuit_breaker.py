@@ -0,0 +1,261 @@
+"""
+Circuit Breaker for the Google Ads API.
+
+When credentials are broken or the API is down, every request would still
+parse the YAML, build a client (walking the API version fallbacks) and run
+a failing query before giving up. The breaker counts consecutive failures
+of client construction and GAQL queries:
+
+- closed: calls go through; ADS_CIRCUIT_FAILURE_THRESHOLD consecutive
+  failures open the circuit.
+- open: calls fail immediately with CircuitOpenError carrying the cached
+  failure, until ADS_CIRCUIT_RESET_TIMEOUT seconds have passed.
+- half-open: one trial call goes through. Success closes the circuit,
+  failure opens it again.
+
+The failure is also written to the shared cache backend for the reset
+timeout (a negative cache), so other worker processes fail fast too
+instead of each rediscovering the outage.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from cache_backends import get_cache_backend
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Consecutive failures that open the circuit
+try:
+    from config import ADS_CIRCUIT_FAILURE_THRESHOLD
+except ImportError:
+    ADS_CIRCUIT_FAILURE_THRESHOLD = 3
+
+# Seconds the circuit stays open (and the failure stays cached) before a trial call
+try:
+    from config import ADS_CIRCUIT_RESET_TIMEOUT
+except ImportError:
+    ADS_CIRCUIT_RESET_TIMEOUT = 60
+
+NAMESPACE = 'circuit'
+
+# Circuit states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# gRPC status codes that mean the API (or our access to it) is unavailable.
+# Other codes, such as INVALID_ARGUMENT for a bad query, prove the API answered.
+OUTAGE_STATUS_CODES = frozenset({
+    'UNAUTHENTICATED', 'PERMISSION_DENIED', 'RESOURCE_EXHAUSTED',
+    'UNAVAILABLE', 'DEADLINE_EXCEEDED', 'INTERNAL'
+})
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while the circuit is open."""
+
+    def __init__(self, name, error, retry_after):
+        super().__init__(f"Circuit {name} is open: {error} (retry in {retry_after}s)")
+        self.name = name
+        self.error = error
+        self.retry_after = retry_after
+
+def is_outage_error(error):
+    """
+    Decide whether an API error should count against the circuit.
+
+    Args:
+        error (Exception): Error raised by client construction or a query
+
+    Returns:
+        bool: False for errors the API answered with (e.g. an invalid query),
+            True for everything else
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    # GoogleAdsException wraps the gRPC call in .error; plain gRPC errors expose .code()
+    call = getattr(error, 'error', error)
+    code = getattr(call, 'code', None)
+    if callable(code):
+        try:
+            name = getattr(code(), 'name', None)
+        except Exception:
+            name = None
+        if name:
+            return name in OUTAGE_STATUS_CODES
+    return True
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit with a negative cache in the shared cache backend.
+
+    In the half-open state the trial belongs to the thread that claimed it,
+    so client construction and the queries that follow in the same request
+    all go through. A trial that never reports back is given up after the
+    reset timeout.
+    """
+
+    def __init__(self, name, failure_threshold=ADS_CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout=ADS_CIRCUIT_RESET_TIMEOUT, backend=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._backend = backend
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._last_error = None
+        self._opened_at = None
+        self._trial_thread = None
+        self._trial_started = None
+        self._stats = {'failures': 0, 'rejected': 0, 'opened': 0}
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = get_cache_backend()
+        return self._backend
+
+    @property
+    def state(self):
+        return self._state
+
+    def _open(self, error, opened_at):
+        self._state = OPEN
+        self._last_error = error
+        self._opened_at = opened_at
+        self._trial_thread = None
+        self._stats['opened'] += 1
+
+    def _shared_failure(self):
+        try:
+            return self.backend.get(NAMESPACE, self.name)
+        except Exception as e:
+            logger.warning(f"Could not read the shared state of circuit {self.name}: {e}")
+            return None
+
+    def before_call(self):
+        """
+        Check that a call may go through.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or another thread holds the half-open trial)
+        """
+        if self._state == CLOSED:
+            shared = self._shared_failure()
+            if shared is None:
+                return
+            with self._lock:
+                if self._state == CLOSED:
+                    self._open(shared['error'], shared['opened_at'])
+                    logger.warning(f"Circuit {self.name} opened by another worker: {shared['error']}")
+
+        with self._lock:
+            now = time.time()
+            trial_expired = self._state == HALF_OPEN and now >= self._trial_started + self.reset_timeout
+            if (self._state == OPEN and now >= self._opened_at + self.reset_timeout) or trial_expired:
+                self._state = HALF_OPEN
+                self._trial_thread = threading.get_ident()
+                self._trial_started = now
+                logger.info(f"Circuit {self.name} half-open, allowing a trial call")
+                return
+            if self._state == CLOSED or (self._state == HALF_OPEN and self._trial_thread == threading.get_ident()):
+                return
+
+            self._stats['rejected'] += 1
+            raise CircuitOpenError(self.name, self._last_error, self._retry_after(now))
+
+    def _retry_after(self, now):
+        if self._opened_at is None:
+            return 0
+        return max(int(self._opened_at + self.reset_timeout - now) + 1, 1)
+
+    def record_success(self):
+        """Close the circuit after a call the API answered."""
+        with self._lock:
+            previous = self._state
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_thread = None
+        if previous != CLOSED:
+            logger.info(f"Circuit {self.name} closed")
+            try:
+                self.backend.delete(NAMESPACE, self.name)
+            except Exception as e:
+                logger.warning(f"Could not clear the shared state of circuit {self.name}: {e}")
+
+    def record_failure(self, error):
+        """
+        Count a failed call; opens the circuit at the threshold or after a failed trial.
+
+        Args:
+            error: The exception or message describing the failure
+        """
+        now = time.time()
+        with self._lock:
+            self._failures += 1
+            self._stats['failures'] += 1
+            opening = self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold)
+            if opening:
+                self._open(str(error), now)
+            else:
+                self._last_error = str(error)
+
+        if opening:
+            logger.error(f"Circuit {self.name} opened for {self.reset_timeout}s after {self._failures} "
+                         f"consecutive failure(s): {error}")
+            try:
+                self.backend.set(NAMESPACE, self.name, {'error': str(error), 'opened_at': now}, self.reset_timeout)
+            except Exception as e:
+                logger.warning(f"Could not share the state of circuit {self.name}: {e}")
+
+    def open_failure(self):
+        """
+        Get the cached failure while the circuit is not closed.
+
+        Returns:
+            dict: {'error': str, 'retry_after': seconds}, or None if the circuit is closed
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return None
+            return {'error': self._last_error, 'retry_after': self._retry_after(time.time())}
+
+    def status(self):
+        """
+        Get the circuit state and counters.
+
+        Returns:
+            dict: state, consecutive failures, last error, opened_at, retry_after
+                and failure/rejection/open counts
+        """
+        with self._lock:
+            now = time.time()
+            return {
+                'name': self.name,
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'last_error': self._last_error,
+                'opened_at': (datetime.fromtimestamp(self._opened_at, timezone.utc).isoformat()
+                              if self._opened_at and self._state != CLOSED else None),
+                'retry_after': self._retry_after(now) if self._state != CLOSED else 0,
+                **self._stats
+            }
+
+# Process-wide circuit around Google Ads client construction and queries
+ads_circuit = CircuitBreaker('google_ads')
+
+def get_circuit_status():
+    """
+    Get the state of the Google Ads circuit.
+
+    Returns:
+        dict: See CircuitBreaker.status
+    """
+    return ads_circuit.status()
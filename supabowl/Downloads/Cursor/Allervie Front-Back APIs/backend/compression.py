@@ -0,0 +1,158 @@
+"""
+Response Compression for the Flask App.
+
+JSON lists of campaigns, ad groups and search terms compress by an order
+of magnitude. An after_request hook compresses responses with brotli (when
+the brotli package is installed) or gzip, whichever the client's
+Accept-Encoding prefers:
+
+- Regular responses are compressed in one go if they are at least
+  COMPRESSION_MIN_SIZE bytes; smaller ones are not worth the CPU.
+- Streamed responses (NDJSON) have no known size. They are compressed
+  chunk by chunk, with a flush after each chunk, so rows still reach the
+  client as they are produced.
+
+Compressed responses get a weak ETag (the bytes differ per encoding) and
+`Vary: Accept-Encoding`. The hook is registered on the app, so it covers
+the extended_bp routes too, and it runs after the conditional GET hook so
+304 responses and ETags are computed on the uncompressed body.
+"""
+
+import logging
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from flask import request
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Compress responses at all
+try:
+    from config import COMPRESSION_ENABLED
+except ImportError:
+    COMPRESSION_ENABLED = True
+
+# Smallest body in bytes worth compressing (streamed responses are always compressed)
+try:
+    from config import COMPRESSION_MIN_SIZE
+except ImportError:
+    COMPRESSION_MIN_SIZE = 1024
+
+# gzip level (1-9) and brotli quality (0-11); moderate levels keep CPU per request low
+try:
+    from config import COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+except ImportError:
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 5
+
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'text/html', 'text/css', 'text/plain', 'text/javascript', 'image/svg+xml'
+})
+
+def _supported_encodings():
+    # In order of preference when the client accepts both equally
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+class _Compressor:
+    """Incremental brotli or gzip compressor."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits=31: gzip container
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self):
+        """Emit everything compressed so far without ending the stream."""
+        if self.encoding == 'br':
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+def _compress_stream(chunks, compressor):
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush()
+        yield compressor.finish()
+    finally:
+        # Let the wrapped generator clean up (e.g. close its request context)
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+def _weaken_etag(response):
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+def compress_response(response):
+    """
+    after_request hook compressing responses the client accepts compressed.
+
+    Args:
+        response (Response): The outgoing response
+
+    Returns:
+        Response: The response, compressed if eligible
+    """
+    if (response.status_code < 200 or response.status_code in (204, 206, 304) or request.method == 'HEAD' or
+            response.direct_passthrough or 'Content-Encoding' in response.headers or
+            response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(_supported_encodings())
+    if encoding is None:
+        return response
+
+    compressor = _Compressor(encoding)
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, compressor)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compressor.compress(data) + compressor.finish())
+
+    response.headers['Content-Encoding'] = encoding
+    _weaken_etag(response)
+    return response
+
+def init_compression(app):
+    """
+    Register response compression on a Flask app.
+
+    Must be called before init_http_caching: after_request hooks run in
+    reverse order of registration, and compression has to come last.
+
+    Args:
+        app (Flask): The application
+    """
+    if not COMPRESSION_ENABLED:
+        logger.info("Response compression disabled")
+        return
+
+    app.after_request(compress_response)
+    logger.info(f"Response compression enabled: {', '.join(_supported_encodings())}")
@@ -18,3 +18,90 @@ ENVIRONMENT = "production"
 MANAGER_CUSTOMER_ID = "5686645688"
 # Client account ID that we want to retrieve metrics for
 CLIENT_CUSTOMER_ID = "8127539892"
+
+# Seconds between background Google Ads connectivity probes
+ADS_HEALTH_PROBE_INTERVAL = 300
+
+# Run GAQL queries with search_stream (falls back to paged search when False or on failure)
+GAQL_USE_SEARCH_STREAM = True
+
+# Maximum GAQL queries in flight at once, and the per-query deadline in seconds
+GAQL_MAX_CONCURRENCY = 4
+GAQL_QUERY_DEADLINE = 60
+
+# Logging: rotating log file, per-call-site rate limit, and opt-in Google Ads wire payload logging
+LOG_FILE = "app.log"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_RATE_LIMIT = 20
+LOG_RATE_WINDOW = 60
+GOOGLE_ADS_WIRE_LOGGING = False
+
+# Result cache for Google Ads fetch functions: seconds each endpoint stays fresh
+RESULT_CACHE_TTLS = {
+    'ads_performance': 300,
+    'campaign_performance': 600,
+    'ad_group_performance': 600,
+    'search_term_performance': 900
+}
+
+# Daily partition cache: days still inside the conversion-lag window, and seconds before those days are re-synced
+PARTITION_HOT_DAYS = 3
+PARTITION_HOT_TTL = 900
+PARTITION_CACHE_MAX_PARTITIONS = 20000
+
+# Local SQLite fact store for daily metrics (falls back to the in-memory partition cache when disabled).
+# The database is backend/ads_facts.db unless FACT_STORE_PATH is set here.
+FACT_STORE_ENABLED = True
+
+# Rollup cube (campaign and ad group x day, with account totals): seconds a built cube is reused, and cubes kept
+ROLLUP_CUBE_TTL = 300
+ROLLUP_CUBE_MAX_CUBES = 16
+
+# Stale-while-revalidate: seconds after which stale results are no longer served, and background refresh threads
+RESULT_CACHE_HARD_TTLS = {
+    'ads_performance': 3600,
+    'campaign_performance': 3600,
+    'ad_group_performance': 3600
+}
+RESULT_CACHE_REFRESH_WORKERS = 2
+
+# Cache-Control sent with /api/ JSON responses (all carry an ETag for conditional GETs)
+API_CACHE_CONTROL = "private, no-cache"
+
+# Cache backend shared by the result, token verification and account metadata caches:
+# "sqlite" (backend/cache.db, shared by all workers and kept across restarts) or "memory" (per process)
+CACHE_BACKEND = "sqlite"
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+# Seconds between recorded accesses of a SQLite cache entry (each one is a write)
+CACHE_ACCESS_RESOLUTION = 60
+
+# Seconds a successful Google Ads refresh token verification is trusted
+TOKEN_VERIFICATION_TTL = 3600
+
+# Startup cache warming for the dashboard's default windows (days back from today)
+CACHE_WARM_ON_STARTUP = True
+CACHE_WARM_BLOCKING = False
+CACHE_WARM_WINDOWS = [30]
+
+# Google Ads circuit breaker: consecutive failures that open it, and seconds before a trial call
+ADS_CIRCUIT_FAILURE_THRESHOLD = 3
+ADS_CIRCUIT_RESET_TIMEOUT = 60
+
+# Account metadata cache (accessible customers, hierarchy, currency, time zone): seconds kept, and age that triggers a background refresh
+ACCOUNT_METADATA_TTL = 86400
+ACCOUNT_METADATA_REFRESH_AFTER = 3600
+
+# List endpoint pagination (?limit=&cursor=&sort=): default and maximum page size, and sorted indexes kept in memory
+PAGINATION_DEFAULT_LIMIT = 100
+PAGINATION_MAX_LIMIT = 1000
+PAGINATION_MAX_INDEXES = 64
+
+# Encode JSON responses with orjson when it is installed (standard library otherwise)
+FAST_JSON_ENABLED = True
+
+# gzip/brotli response compression: minimum body size in bytes (streams are always compressed), gzip level and brotli quality
+COMPRESSION_ENABLED = True
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
@@ -11,6 +11,7 @@ import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 import traceback
+from functools import partial
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -25,14 +26,139 @@ try:
     from google.ads.googleads.client import GoogleAdsClient
     from google.ads.googleads.errors import GoogleAdsException
     from google_ads_client import get_google_ads_client  # Import the centralized client initialization
+    from gaql_executor import execute_query
     logger.info("Successfully imported Google Ads API libraries")
 except ImportError as e:
     logger.error(f"Failed to import Google Ads API libraries: {e}")
     GoogleAdsClient = None
     GoogleAdsException = Exception
 
-def get_campaign_performance(client, days=30):
-    """Get campaign performance data for the last 30 days"""
+from request_coalescing import coalesced
+from result_cache import cached
+from ads_aggregation import KeyedAccumulator, counter_metrics, metric_fields
+from rollup_cube import get_rollup_cube
+
+def _resolve_date_range(days, start_date=None, end_date=None):
+    """
+    Resolve the reporting window of a fetch function.
+    
+    Explicit dates win; otherwise the window is the last `days` days up to today.
+    
+    Returns:
+        tuple: (start_date, end_date) as YYYY-MM-DD strings
+    """
+    if not end_date:
+        end_date = datetime.now().date().strftime("%Y-%m-%d")
+    if not start_date:
+        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
+        start_date = (end_date_obj - timedelta(days=days)).strftime("%Y-%m-%d")
+    return start_date, end_date
+
+def _new_campaign_entry(row):
+    """Build the identity fields of a campaign entry from a stored row."""
+    return {
+        'id': row['entity_id'],
+        'name': row['campaign_name'],
+        'status': row['status'],
+    }
+
+def _new_ad_group_entry(row):
+    """Build the identity fields of an ad group entry from a stored row."""
+    return {
+        'id': row['entity_id'],
+        'name': row['ad_group_name'],
+        'campaign_id': row['campaign_id'],
+        'campaign_name': row['campaign_name'],
+        'status': row['status'],
+    }
+
+def _new_search_term_entry(search_term, campaign, ad_group):
+    """Build the identity fields of a search term entry."""
+    # Create a new search term dictionary with required fields
+    return {
+        'search_term': search_term,
+        'campaign_id': str(campaign.id),
+        'campaign_name': campaign.name if hasattr(campaign, 'name') else "Unnamed Campaign",
+        'ad_group_id': str(ad_group.id),
+        'ad_group_name': ad_group.name if hasattr(ad_group, 'name') else "Unnamed Ad Group",
+    }
+
+# Search term SELECT list, in query order
+SEARCH_TERM_COLUMNS = (
+    'campaign.id',
+    'campaign.name',
+    'ad_group.id',
+    'ad_group.name',
+    'search_term_view.search_term',
+    'metrics.impressions',
+    'metrics.clicks',
+    'metrics.cost_micros',
+    'metrics.ctr',
+)
+
+# Columns each search term response field needs (CTR is recomputed from clicks when rows merge)
+SEARCH_TERM_FIELD_COLUMNS = {
+    'search_term': ('search_term_view.search_term',),
+    'campaign_id': ('campaign.id',),
+    'campaign_name': ('campaign.name',),
+    'ad_group_id': ('ad_group.id',),
+    'ad_group_name': ('ad_group.name',),
+    'impressions': ('metrics.impressions',),
+    'clicks': ('metrics.clicks',),
+    'cost': ('metrics.cost_micros',),
+    'ctr': ('metrics.ctr', 'metrics.clicks'),
+}
+
+# Always selected: the aggregation key and the ORDER BY column
+SEARCH_TERM_KEY_COLUMNS = ('campaign.id', 'ad_group.id', 'search_term_view.search_term', 'metrics.impressions')
+
+def _search_term_query(start_date, end_date, ad_group_id=None, fields=None):
+    """Build the search term GAQL query, optionally filtered to one ad group and projected to some fields."""
+    # Build the query with optional ad_group_id filter
+    ad_group_filter = f"AND ad_group.id = {ad_group_id}" if ad_group_id else ""
+    
+    # Select only the columns the requested fields need
+    if fields is None:
+        columns = SEARCH_TERM_COLUMNS
+    else:
+        needed = set(SEARCH_TERM_KEY_COLUMNS)
+        for field in fields:
+            needed.update(SEARCH_TERM_FIELD_COLUMNS[field])
+        columns = [column for column in SEARCH_TERM_COLUMNS if column in needed]
+    select = ",\n            ".join(columns)
+    
+    return f"""
+        SELECT
+            {select}
+        FROM search_term_view
+        WHERE segments.date BETWEEN '{start_date}' AND '{end_date}'
+        {ad_group_filter}
+        ORDER BY metrics.impressions DESC
+        LIMIT 1000
+    """
+
+@cached('campaign_performance')
+@coalesced('campaign_performance')
+def get_campaign_performance(client, days=30, start_date=None, end_date=None):
+    """
+    Get campaign performance data for a date range.
+    
+    Campaign totals are rolled up from the campaign x day rows of the
+    rollup cube (see rollup_cube), so campaigns without ad groups are
+    included; only days the fact store has not synced and days inside the
+    conversion-lag window are queried from the API.
+    
+    Args:
+        client (GoogleAdsClient): Google Ads API client
+        days (int, optional): Number of days to look back when no dates are given.
+            Defaults to 30.
+        start_date (str, optional): Start date in YYYY-MM-DD format.
+        end_date (str, optional): End date in YYYY-MM-DD format. Defaults to today.
+    
+    Returns:
+        list: One entry per campaign, sorted by name
+        None: If the request fails
+    """
     try:
         if not client:
             logger.error("No Google Ads client provided")
@@ -40,10 +166,6 @@ def get_campaign_performance(client, days=30):
             
         logger.info(f"Client type: {type(client).__name__}")
         
-        # Get the Google Ads service
-        google_ads_service = client.get_service("GoogleAdsService")
-        logger.info(f"Got GoogleAdsService: {type(google_ads_service).__name__}")
-        
         # Get the client account ID from config, falling back to manager ID if not found
         try:
             from config import CLIENT_CUSTOMER_ID
@@ -55,112 +177,18 @@ def get_campaign_performance(client, days=30):
             logger.info(f"Using customer ID from client: {customer_id}")
         
         # Calculate the date range
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=days)
-        
-        # Format the dates for the query
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        end_date_str = end_date.strftime("%Y-%m-%d")
+        start_date_str, end_date_str = _resolve_date_range(days, start_date, end_date)
         logger.info(f"Querying data from {start_date_str} to {end_date_str}")
         
-        # Build the query
-        query = f"""
-            SELECT
-                campaign.id,
-                campaign.name,
-                campaign.status,
-                metrics.impressions,
-                metrics.clicks,
-                metrics.cost_micros,
-                metrics.ctr
-            FROM campaign
-            WHERE segments.date BETWEEN '{start_date_str}' AND '{end_date_str}'
-            ORDER BY campaign.name
-        """
-        
-        # Execute the query (trying both v17 and legacy approaches)
-        logger.info("Executing Google Ads API query for campaigns")
+        # One cube sync serves every level; campaigns are rolled up from its campaign x day rows
+        cube = get_rollup_cube(client, customer_id, start_date_str, end_date_str)
         
-        try:
-            # First try the direct v17 style
-            logger.info("Trying direct parameter style...")
-            response = google_ads_service.search(
-                customer_id=customer_id,
-                query=query
-            )
-            logger.info("Direct parameter style succeeded")
-        except Exception as e:
-            logger.warning(f"Direct parameter style failed: {e}, trying legacy style")
-            
-            # Fall back to legacy style
-            search_request = client.get_type("SearchGoogleAdsRequest")
-            search_request.customer_id = customer_id
-            search_request.query = query
-            response = google_ads_service.search(request=search_request)
-            logger.info("Legacy parameter style succeeded")
-        
-        # Process the results
         campaigns = []
-        row_count = 0
+        for row in cube.rollup('campaign', start_date_str, end_date_str):
+            campaign = _new_campaign_entry(row)
+            campaign.update(metric_fields(counter_metrics(row)))
+            campaigns.append(campaign)
         
-        for row in response:
-            row_count += 1
-            campaign = row.campaign
-            metrics = row.metrics
-            
-            logger.info(f"Processing campaign: {campaign.name} (ID: {campaign.id})")
-            
-            # Check if this campaign is already in our list
-            existing_campaign = next((c for c in campaigns if c['id'] == str(campaign.id)), None)
-            
-            if existing_campaign:
-                # Update the existing campaign with additional metrics
-                # Only add values that are present and valid
-                if hasattr(metrics, 'impressions') and metrics.impressions is not None:
-                    existing_campaign['impressions'] += metrics.impressions
-                
-                if hasattr(metrics, 'clicks') and metrics.clicks is not None:
-                    existing_campaign['clicks'] += metrics.clicks
-                
-                if hasattr(metrics, 'cost_micros') and metrics.cost_micros is not None:
-                    existing_campaign['cost'] += metrics.cost_micros / 1000000
-            else:
-                # Create a new campaign dictionary with only ID and name as required fields
-                new_campaign = {
-                    'id': str(campaign.id),
-                    'name': campaign.name if hasattr(campaign, 'name') else "Unnamed Campaign",
-                }
-                
-                # Add other attributes only if they exist and are valid
-                if hasattr(campaign, 'status') and campaign.status is not None:
-                    new_campaign['status'] = campaign.status.name
-                else:
-                    new_campaign['status'] = "N/A"
-                
-                if hasattr(metrics, 'impressions') and metrics.impressions is not None:
-                    new_campaign['impressions'] = metrics.impressions
-                else:
-                    new_campaign['impressions'] = "N/A"
-                    
-                if hasattr(metrics, 'clicks') and metrics.clicks is not None:
-                    new_campaign['clicks'] = metrics.clicks
-                else:
-                    new_campaign['clicks'] = "N/A"
-                    
-                if hasattr(metrics, 'cost_micros') and metrics.cost_micros is not None:
-                    new_campaign['cost'] = metrics.cost_micros / 1000000  # Convert micros to dollars
-                else:
-                    new_campaign['cost'] = "N/A"
-                    
-                if hasattr(metrics, 'ctr') and metrics.ctr is not None:
-                    new_campaign['ctr'] = metrics.ctr * 100  # Convert to percentage
-                else:
-                    new_campaign['ctr'] = "N/A"
-                
-                # Add the new campaign to our list
-                campaigns.append(new_campaign)
-        
-        logger.info(f"Processed {row_count} rows from the response")
         logger.info(f"Successfully retrieved data for {len(campaigns)} campaigns")
         
         # Sort campaigns by name
@@ -180,16 +208,32 @@ def get_campaign_performance(client, days=30):
         logger.error(traceback.format_exc())
         return None
 
-def get_ad_group_performance(client, days=30):
-    """Get ad group performance data for the last 30 days"""
+@cached('ad_group_performance')
+@coalesced('ad_group_performance')
+def get_ad_group_performance(client, days=30, start_date=None, end_date=None):
+    """
+    Get ad group performance data for a date range.
+    
+    Ad group totals come from the ad group x day rows of the rollup cube
+    (see rollup_cube); only days the fact store has not synced and days
+    inside the conversion-lag window are queried from the API.
+    
+    Args:
+        client (GoogleAdsClient): Google Ads API client
+        days (int, optional): Number of days to look back when no dates are given.
+            Defaults to 30.
+        start_date (str, optional): Start date in YYYY-MM-DD format.
+        end_date (str, optional): End date in YYYY-MM-DD format. Defaults to today.
+    
+    Returns:
+        list: One entry per ad group, sorted by campaign name and ad group name
+        None: If the request fails
+    """
     try:
         if not client:
             logger.error("No Google Ads client provided")
             return None
         
-        # Get the Google Ads service
-        google_ads_service = client.get_service("GoogleAdsService")
-        
         # Get the client account ID from config, falling back to manager ID if not found
         try:
             from config import CLIENT_CUSTOMER_ID
@@ -201,105 +245,18 @@ def get_ad_group_performance(client, days=30):
             logger.info(f"Using customer ID from client: {customer_id}")
         
         # Calculate the date range
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=days)
-        
-        # Format the dates for the query
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        end_date_str = end_date.strftime("%Y-%m-%d")
+        start_date_str, end_date_str = _resolve_date_range(days, start_date, end_date)
         logger.info(f"Querying data from {start_date_str} to {end_date_str}")
         
-        # Build the query
-        query = f"""
-            SELECT
-                campaign.id,
-                campaign.name,
-                ad_group.id,
-                ad_group.name,
-                ad_group.status,
-                metrics.impressions,
-                metrics.clicks,
-                metrics.cost_micros,
-                metrics.ctr
-            FROM ad_group
-            WHERE segments.date BETWEEN '{start_date_str}' AND '{end_date_str}'
-            ORDER BY campaign.name, ad_group.name
-        """
-        
-        # Execute the query
-        logger.info("Executing Google Ads API query for ad groups")
-        search_request = client.get_type("SearchGoogleAdsRequest")
-        search_request.customer_id = customer_id
-        search_request.query = query
+        # One cube sync serves every level (shared with campaigns and account totals)
+        cube = get_rollup_cube(client, customer_id, start_date_str, end_date_str)
         
-        # Get the results
-        response = google_ads_service.search(request=search_request)
-        
-        # Process the results
         ad_groups = []
-        row_count = 0
+        for row in cube.rollup('ad_group', start_date_str, end_date_str):
+            ad_group = _new_ad_group_entry(row)
+            ad_group.update(metric_fields(counter_metrics(row)))
+            ad_groups.append(ad_group)
         
-        for row in response:
-            row_count += 1
-            campaign = row.campaign
-            ad_group = row.ad_group
-            metrics = row.metrics
-            
-            logger.info(f"Processing ad group: {ad_group.name} (ID: {ad_group.id}) in campaign: {campaign.name}")
-            
-            # Check if this ad group is already in our list
-            existing_ad_group = next((ag for ag in ad_groups if ag['id'] == str(ad_group.id)), None)
-            
-            if existing_ad_group:
-                # Update the existing ad group with additional metrics
-                # Only add values that are present and valid
-                if hasattr(metrics, 'impressions') and metrics.impressions is not None:
-                    existing_ad_group['impressions'] += metrics.impressions
-                
-                if hasattr(metrics, 'clicks') and metrics.clicks is not None:
-                    existing_ad_group['clicks'] += metrics.clicks
-                
-                if hasattr(metrics, 'cost_micros') and metrics.cost_micros is not None:
-                    existing_ad_group['cost'] += metrics.cost_micros / 1000000
-            else:
-                # Create a new ad group dictionary with only ID and name as required fields
-                new_ad_group = {
-                    'id': str(ad_group.id),
-                    'name': ad_group.name if hasattr(ad_group, 'name') else "Unnamed Ad Group",
-                    'campaign_id': str(campaign.id),
-                    'campaign_name': campaign.name if hasattr(campaign, 'name') else "Unnamed Campaign",
-                }
-                
-                # Add other attributes only if they exist and are valid
-                if hasattr(ad_group, 'status') and ad_group.status is not None:
-                    new_ad_group['status'] = ad_group.status.name
-                else:
-                    new_ad_group['status'] = "N/A"
-                
-                if hasattr(metrics, 'impressions') and metrics.impressions is not None:
-                    new_ad_group['impressions'] = metrics.impressions
-                else:
-                    new_ad_group['impressions'] = "N/A"
-                    
-                if hasattr(metrics, 'clicks') and metrics.clicks is not None:
-                    new_ad_group['clicks'] = metrics.clicks
-                else:
-                    new_ad_group['clicks'] = "N/A"
-                    
-                if hasattr(metrics, 'cost_micros') and metrics.cost_micros is not None:
-                    new_ad_group['cost'] = metrics.cost_micros / 1000000  # Convert micros to dollars
-                else:
-                    new_ad_group['cost'] = "N/A"
-                    
-                if hasattr(metrics, 'ctr') and metrics.ctr is not None:
-                    new_ad_group['ctr'] = metrics.ctr * 100  # Convert to percentage
-                else:
-                    new_ad_group['ctr'] = "N/A"
-                
-                # Add the new ad group to our list
-                ad_groups.append(new_ad_group)
-        
-        logger.info(f"Processed {row_count} rows from the response")
         logger.info(f"Successfully retrieved data for {len(ad_groups)} ad groups")
         
         # Sort ad groups by campaign name and then ad group name
@@ -319,7 +276,9 @@ def get_ad_group_performance(client, days=30):
         logger.error(traceback.format_exc())
         return None
 
-def get_search_term_performance(start_date=None, end_date=None, ad_group_id=None):
+@cached('search_term_performance')
+@coalesced('search_term_performance')
+def get_search_term_performance(start_date=None, end_date=None, ad_group_id=None, fields=None):
     """
     Get search term performance data for the specified date range and ad group
     
@@ -330,6 +289,9 @@ def get_search_term_performance(start_date=None, end_date=None, ad_group_id=None
             Defaults to today.
         ad_group_id (str, optional): Filter by specific ad group ID.
             Defaults to None (all ad groups).
+        fields (tuple, optional): Response fields to query (see field_projection).
+            Entries keep every key, but fields outside the projection hold
+            defaults and must be pruned. Defaults to None (all fields).
     """
     try:
         # Create a Google Ads client
@@ -339,9 +301,6 @@ def get_search_term_performance(start_date=None, end_date=None, ad_group_id=None
             logger.error("Failed to create Google Ads client")
             return None
         
-        # Get the Google Ads service
-        google_ads_service = client.get_service("GoogleAdsService")
-        
         # Get the client account ID from config, falling back to manager ID if not found
         try:
             from config import CLIENT_CUSTOMER_ID
@@ -370,110 +329,27 @@ def get_search_term_performance(start_date=None, end_date=None, ad_group_id=None
         end_date_str = end_date
         logger.info(f"Querying data from {start_date_str} to {end_date_str}")
         
-        # Build the query with optional ad_group_id filter
-        ad_group_filter = f"AND ad_group.id = {ad_group_id}" if ad_group_id else ""
-        
-        query = f"""
-            SELECT
-                campaign.id,
-                campaign.name,
-                ad_group.id,
-                ad_group.name,
-                search_term_view.search_term,
-                metrics.impressions,
-                metrics.clicks,
-                metrics.cost_micros,
-                metrics.ctr
-            FROM search_term_view
-            WHERE segments.date BETWEEN '{start_date_str}' AND '{end_date_str}'
-            {ad_group_filter}
-            ORDER BY metrics.impressions DESC
-            LIMIT 1000
-        """
-        
-        # Execute the query
-        logger.info("Executing Google Ads API query for search terms")
+        query = _search_term_query(start_date_str, end_date_str, ad_group_id, fields)
         
-        try:
-            # First try the direct v19 style
-            logger.info(f"Trying direct parameter style with customer_id={customer_id}")
-            response = google_ads_service.search(
-                customer_id=customer_id,
-                query=query
-            )
-            logger.info("Direct parameter style succeeded")
-        except Exception as e:
-            logger.warning(f"Direct parameter style failed: {e}, trying legacy style")
-            
-            # Fall back to legacy style
-            search_request = client.get_type("SearchGoogleAdsRequest")
-            search_request.customer_id = customer_id
-            search_request.query = query
-            response = google_ads_service.search(request=search_request)
-            logger.info("Legacy parameter style succeeded")
+        # Execute the query, streaming rows into the aggregation below
+        logger.info(f"Executing Google Ads API query for search terms with customer_id={customer_id}")
+        response = execute_query(client, customer_id, query, label='search_term_performance')
         
-        # Process the results
-        search_terms = []
-        row_count = 0
+        # Process the results, keyed by (search term, campaign ID, ad group ID)
+        accumulator = KeyedAccumulator()
         
         for row in response:
-            row_count += 1
             campaign = row.campaign
             ad_group = row.ad_group
             search_term = row.search_term_view.search_term
-            metrics = row.metrics
             
-            logger.info(f"Processing search term: {search_term}")
+            logger.debug("Processing search term: %s", search_term)
             
-            # Check if this search term is already in our list
-            existing_term = next((st for st in search_terms if st['search_term'] == search_term and 
-                                 st['campaign_id'] == str(campaign.id) and 
-                                 st['ad_group_id'] == str(ad_group.id)), None)
-            
-            if existing_term:
-                # Update the existing search term with additional metrics
-                # Only add values that are present and valid
-                if hasattr(metrics, 'impressions') and metrics.impressions is not None:
-                    existing_term['impressions'] += metrics.impressions
-                
-                if hasattr(metrics, 'clicks') and metrics.clicks is not None:
-                    existing_term['clicks'] += metrics.clicks
-                
-                if hasattr(metrics, 'cost_micros') and metrics.cost_micros is not None:
-                    existing_term['cost'] += metrics.cost_micros / 1000000
-            else:
-                # Create a new search term dictionary with required fields
-                new_term = {
-                    'search_term': search_term,
-                    'campaign_id': str(campaign.id),
-                    'campaign_name': campaign.name if hasattr(campaign, 'name') else "Unnamed Campaign",
-                    'ad_group_id': str(ad_group.id),
-                    'ad_group_name': ad_group.name if hasattr(ad_group, 'name') else "Unnamed Ad Group",
-                }
-                
-                # Add other metrics only if they exist and are valid
-                if hasattr(metrics, 'impressions') and metrics.impressions is not None:
-                    new_term['impressions'] = metrics.impressions
-                else:
-                    new_term['impressions'] = "N/A"
-                    
-                if hasattr(metrics, 'clicks') and metrics.clicks is not None:
-                    new_term['clicks'] = metrics.clicks
-                else:
-                    new_term['clicks'] = "N/A"
-                    
-                if hasattr(metrics, 'cost_micros') and metrics.cost_micros is not None:
-                    new_term['cost'] = metrics.cost_micros / 1000000  # Convert micros to dollars
-                else:
-                    new_term['cost'] = "N/A"
-                    
-                if hasattr(metrics, 'ctr') and metrics.ctr is not None:
-                    new_term['ctr'] = metrics.ctr * 100  # Convert to percentage
-                else:
-                    new_term['ctr'] = "N/A"
-                
-                # Add the new search term to our list
-                search_terms.append(new_term)
+            key = (search_term, str(campaign.id), str(ad_group.id))
+            accumulator.add(key, row.metrics, partial(_new_search_term_entry, search_term, campaign, ad_group))
+        
+        search_terms = accumulator.values()
+        row_count = accumulator.row_count
         
         logger.info(f"Processed {row_count} rows from the response")
         logger.info(f"Successfully retrieved data for {len(search_terms)} search terms")
@@ -494,3 +370,63 @@ def get_search_term_performance(start_date=None, end_date=None, ad_group_id=None
         logger.error(f"Error getting search term performance: {e}")
         logger.error(traceback.format_exc())
         return None
+
+def stream_search_term_performance(client, start_date=None, end_date=None, ad_group_id=None, fields=None):
+    """
+    Yield search term entries as search_stream delivers them.
+    
+    Rows of search_term_view are unique per (search term, campaign, ad group)
+    and the query already sorts them by impressions, so entries are emitted
+    without aggregating or sorting first. Once the stream completes the
+    entries are cached as the result of get_search_term_performance for the
+    same arguments.
+    
+    Args:
+        client (GoogleAdsClient): Google Ads API client
+        start_date (str, optional): Start date in YYYY-MM-DD format.
+            Defaults to 30 days ago.
+        end_date (str, optional): End date in YYYY-MM-DD format.
+            Defaults to today.
+        ad_group_id (str, optional): Filter by specific ad group ID.
+        fields (tuple, optional): Response fields to query, as for get_search_term_performance.
+    
+    Yields:
+        dict: One search term entry, in the format of get_search_term_performance
+    
+    Raises:
+        Exception: Errors from the Google Ads query propagate to the caller
+    """
+    # Get the client account ID from config, falling back to manager ID if not found
+    try:
+        from config import CLIENT_CUSTOMER_ID
+        customer_id = CLIENT_CUSTOMER_ID
+    except ImportError:
+        customer_id = client.login_customer_id
+    
+    start_date_str, end_date_str = _resolve_date_range(30, start_date, end_date)
+    query = _search_term_query(start_date_str, end_date_str, ad_group_id, fields)
+    logger.info(f"Streaming search terms from {start_date_str} to {end_date_str} with customer_id={customer_id}")
+    
+    entries = []
+    seen = set()
+    for row in execute_query(client, customer_id, query, label='search_term_performance_stream'):
+        campaign = row.campaign
+        ad_group = row.ad_group
+        search_term = row.search_term_view.search_term
+        
+        entry = _new_search_term_entry(search_term, campaign, ad_group)
+        entry.update(metric_fields(row.metrics))
+        if entries is not None:
+            key = (search_term, str(campaign.id), str(ad_group.id))
+            if key in seen:
+                # Would have been merged by the aggregating fetch, so the stream can't be cached as its result
+                logger.warning(f"Duplicate search term row for {key}, not caching the streamed result")
+                entries = None
+            else:
+                seen.add(key)
+                entries.append(entry)
+        yield entry
+    
+    if entries:
+        get_search_term_performance.prime(entries, start_date, end_date, ad_group_id, fields)
+        logger.info(f"Cached {len(entries)} streamed search terms")
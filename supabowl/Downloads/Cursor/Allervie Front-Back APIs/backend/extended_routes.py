@@ -11,6 +11,7 @@ import sys
 from datetime import datetime
 import traceback
 import os
+import itertools
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -36,7 +37,8 @@ try:
         get_google_ads_client,
         get_campaign_performance,
         get_ad_group_performance,
-        get_search_term_performance
+        get_search_term_performance,
+        stream_search_term_performance
     )
     logger.info("Successfully imported Google Ads API functions")
 except ImportError:
@@ -45,6 +47,22 @@ except ImportError:
     get_campaign_performance = None
     get_ad_group_performance = None
     get_search_term_performance = None
+    stream_search_term_performance = None
+
+try:
+    from gaql_executor import get_query_stats
+    from request_coalescing import get_coalescing_stats
+except ImportError:
+    logger.error("Failed to import GAQL executor statistics")
+    get_query_stats = None
+    get_coalescing_stats = None
+
+from http_caching import freshness_headers, not_modified
+from circuit_breaker import ads_circuit
+from pagination import PaginationError, paginate, parse_page_request
+from result_cache import pop_freshness
+from ndjson_streaming import ndjson_response, wants_ndjson
+from field_projection import ProjectionError, parse_fields, project_row, project_rows, widen
 
 # Create a blueprint for the Google Ads API routes
 extended_bp = Blueprint('extended_bp', __name__)
@@ -56,9 +74,95 @@ AVAILABLE_ENDPOINTS = [
     {"name": "Keywords", "endpoint": "/api/google-ads/keywords", "description": "Keyword performance data"},
     {"name": "Search Terms", "endpoint": "/api/google-ads/search_terms", "description": "Search term performance data"},
     {"name": "Ads", "endpoint": "/api/google-ads/ads", "description": "Ad performance data"},
-    {"name": "Performance", "endpoint": "/api/google-ads/performance", "description": "Overall performance metrics"}
+    {"name": "Performance", "endpoint": "/api/google-ads/performance", "description": "Overall performance metrics"},
+    {"name": "Dashboard", "endpoint": "/api/google-ads/dashboard", "description": "Performance, campaigns and ad groups in one response"}
 ]
 
+def circuit_open_response():
+    """
+    Build a fail-fast response from the cached failure while the Google Ads circuit is open.
+    
+    Returns:
+        tuple: A 503 response with a Retry-After header, or None if the circuit is closed
+    """
+    failure = ads_circuit.open_failure()
+    if failure is None:
+        return None
+    
+    logger.error(f"Google Ads circuit is open, failing fast: {failure['error']}")
+    return jsonify({
+        "error": "Google Ads API unavailable",
+        "message": failure['error'],
+        "retryAfter": failure['retry_after'],
+        "environment": ENVIRONMENT
+    }), 503, {'Retry-After': str(failure['retry_after'])}
+
+def list_response(rows, page_request, stream=False, fields=None):
+    """
+    Build the response of a list endpoint: the full array, or one page of it.
+    
+    Args:
+        rows (list): The fetch function's result
+        page_request (PageRequest): Pagination parameters, or None for the full array
+        stream (bool, optional): Write the rows as NDJSON, one per line. A page's
+            next cursor is then sent in the X-Next-Cursor header. Defaults to False.
+        fields (tuple, optional): Projection to prune the rows to, after sorting.
+            Defaults to None (all fields).
+    
+    Returns:
+        tuple: The JSON response, status and freshness headers
+    """
+    if page_request is None:
+        if stream:
+            return ndjson_response((project_row(row, fields) for row in rows), freshness_headers())
+        return jsonify(project_rows(rows, fields)), 200, freshness_headers()
+    try:
+        page = paginate(rows, page_request)
+    except PaginationError as e:
+        # The error response carries no ETag; don't leave the freshness to the next request
+        pop_freshness()
+        return invalid_parameters_response(page_request.endpoint, e)
+    page['items'] = project_rows(page['items'], fields)
+    if stream:
+        headers = freshness_headers()
+        if page['nextCursor']:
+            headers['X-Next-Cursor'] = page['nextCursor']
+        return ndjson_response(page['items'], headers)
+    return jsonify(page), 200, freshness_headers()
+
+def page_request_or_error(endpoint):
+    """
+    Parse the pagination parameters of the current request.
+    
+    Returns:
+        tuple: (PageRequest or None, None) or (None, a 400 response)
+    """
+    try:
+        return parse_page_request(endpoint, request.args), None
+    except PaginationError as e:
+        return None, invalid_parameters_response(endpoint, e)
+
+def fields_or_error(endpoint):
+    """
+    Parse the field projection of the current request.
+    
+    Returns:
+        tuple: (fields or None, None) or (None, a 400 response)
+    """
+    try:
+        return parse_fields(endpoint, request.args), None
+    except ProjectionError as e:
+        return None, invalid_parameters_response(endpoint, e)
+
+def invalid_parameters_response(endpoint, error):
+    """Build the 400 response for invalid pagination or projection parameters."""
+    logger.warning(f"Invalid parameters for {endpoint}: {error}")
+    return jsonify({
+        "error": "Invalid parameters",
+        "message": str(error),
+        "environment": ENVIRONMENT
+    }), 400
+
 @extended_bp.route('/available_endpoints', methods=['GET'])
 def get_available_endpoints():
     """Get list of available Google Ads API endpoints"""
@@ -72,6 +176,38 @@ def get_available_endpoints():
         
     return jsonify(AVAILABLE_ENDPOINTS)
 
+@extended_bp.route('/query_stats', methods=['GET'])
+def get_gaql_query_stats():
+    """Get rows and batches fetched per GAQL query"""
+    # Verify authentication
+    auth_header = request.headers.get('Authorization', '')
+    
+    # If no authorization header or invalid token format, require authentication
+    if not auth_header.startswith('Bearer ') and 'user_id' not in session:
+        logger.warning("Unauthorized access attempt to query_stats endpoint")
+        return jsonify({"error": "Unauthorized", "message": "Authentication required"}), 401
+    
+    if not get_query_stats:
+        return jsonify({"error": "Query statistics unavailable"}), 500
+    
+    return jsonify(get_query_stats())
+
+@extended_bp.route('/coalescing_stats', methods=['GET'])
+def get_request_coalescing_stats():
+    """Get single-flight leader and follower counts per fetch function"""
+    # Verify authentication
+    auth_header = request.headers.get('Authorization', '')
+    
+    # If no authorization header or invalid token format, require authentication
+    if not auth_header.startswith('Bearer ') and 'user_id' not in session:
+        logger.warning("Unauthorized access attempt to coalescing_stats endpoint")
+        return jsonify({"error": "Unauthorized", "message": "Authentication required"}), 401
+    
+    if not get_coalescing_stats:
+        return jsonify({"error": "Coalescing statistics unavailable"}), 500
+    
+    return jsonify(get_coalescing_stats())
+
 @extended_bp.route('/campaigns', methods=['GET'])
 def get_campaigns():
     """
@@ -88,21 +224,36 @@ def get_campaigns():
     # Get request parameters
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
+    page_request, error_response = page_request_or_error('campaigns')
+    if error_response:
+        return error_response
+    fields, error_response = fields_or_error('campaigns')
+    if error_response:
+        return error_response
+    stream = wants_ndjson()
     
     logger.info(f"Received request for campaigns")
     
+    # Answer If-None-Match from the result cache without fetching
+    cached_response = not_modified(get_campaign_performance, None, start_date=start_date, end_date=end_date)
+    if cached_response:
+        return cached_response
+    
     # Use only real data
     try:
         # Create a Google Ads client
         client = get_google_ads_client()
-        if client:
-            logger.info(f"Successfully created Google Ads client")
+        # While the circuit is open, cached results are still served without a client
+        if client or ads_circuit.open_failure():
             # Get campaign performance data
-            real_data = get_campaign_performance(client)
+            real_data = get_campaign_performance(client, start_date=start_date, end_date=end_date)
             if real_data:
                 logger.info(f"Successfully retrieved {len(real_data)} campaigns")
-                return jsonify(real_data)
+                return list_response(real_data, page_request, stream, fields)
             else:
+                circuit_response = circuit_open_response()
+                if circuit_response:
+                    return circuit_response
                 logger.error("No campaign data returned from Google Ads API")
                 return jsonify({
                     "error": "No data available",
@@ -142,21 +293,36 @@ def get_ad_groups():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     campaign_id = request.args.get('campaign_id')
+    page_request, error_response = page_request_or_error('ad_groups')
+    if error_response:
+        return error_response
+    fields, error_response = fields_or_error('ad_groups')
+    if error_response:
+        return error_response
+    stream = wants_ndjson()
     
     logger.info(f"Received request for ad groups")
     
+    # Answer If-None-Match from the result cache without fetching
+    cached_response = not_modified(get_ad_group_performance, None, start_date=start_date, end_date=end_date)
+    if cached_response:
+        return cached_response
+    
     # Use only real data
     try:
         # Create a Google Ads client
         client = get_google_ads_client()
-        if client:
-            logger.info(f"Successfully created Google Ads client")
+        # While the circuit is open, cached results are still served without a client
+        if client or ads_circuit.open_failure():
             # Get ad group performance data
-            real_data = get_ad_group_performance(client)
+            real_data = get_ad_group_performance(client, start_date=start_date, end_date=end_date)
             if real_data:
                 logger.info(f"Successfully retrieved {len(real_data)} ad groups")
-                return jsonify(real_data)
+                return list_response(real_data, page_request, stream, fields)
             else:
+                circuit_response = circuit_open_response()
+                if circuit_response:
+                    return circuit_response
                 logger.error("No ad group data returned from Google Ads API")
                 return jsonify({
                     "error": "No data available",
@@ -196,19 +362,42 @@ def get_search_terms():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     campaign_id = request.args.get('campaign_id')
+    page_request, error_response = page_request_or_error('search_terms')
+    if error_response:
+        return error_response
+    fields, error_response = fields_or_error('search_terms')
+    if error_response:
+        return error_response
+    stream = wants_ndjson()
     
     logger.info(f"Received request for search terms")
     
+    # The projection is pushed into the GAQL query; the sort field must be queried too
+    query_fields = widen('search_terms', fields, page_request.field) if page_request else fields
+    
+    # Answer If-None-Match from the result cache without fetching
+    cached_response = not_modified(get_search_term_performance, start_date, end_date, campaign_id, query_fields)
+    if cached_response:
+        return cached_response
+    
     # Use only real data
     try:
         # Create a Google Ads client
         client = get_google_ads_client()
-        if client and get_search_term_performance:
-            search_terms_data = get_search_term_performance(start_date, end_date, campaign_id)
+        # While the circuit is open, cached results are still served without a client
+        if (client or ads_circuit.open_failure()) and get_search_term_performance:
+            # Uncached full results stream straight from search_stream instead of being aggregated first
+            if (stream and client and page_request is None and stream_search_term_performance
+                    and not get_search_term_performance.peek(start_date, end_date, campaign_id, query_fields)):
+                return stream_search_terms(client, start_date, end_date, campaign_id, query_fields)
+            search_terms_data = get_search_term_performance(start_date, end_date, campaign_id, query_fields)
             if search_terms_data:
                 logger.info(f"Successfully retrieved search terms data")
-                return jsonify(search_terms_data)
+                return list_response(search_terms_data, page_request, stream, fields)
             else:
+                circuit_response = circuit_open_response()
+                if circuit_response:
+                    return circuit_response
                 logger.error("No search terms data returned from Google Ads API")
                 return jsonify({
                     "error": "No data available",
@@ -231,6 +420,41 @@ def get_search_terms():
             "environment": ENVIRONMENT
         }), 500
 
+def stream_search_terms(client, start_date, end_date, ad_group_id, fields=None):
+    """
+    Stream search terms from the API as NDJSON.
+    
+    The first row is read before the response starts, so a query that fails
+    outright still gets a regular error response instead of a broken stream.
+    
+    Returns:
+        Response: The NDJSON response, or an error response
+    """
+    rows = stream_search_term_performance(client, start_date, end_date, ad_group_id, fields)
+    try:
+        first = next(rows, None)
+    except Exception as e:
+        logger.error(f"Error streaming search term data: {e}")
+        circuit_response = circuit_open_response()
+        if circuit_response:
+            return circuit_response
+        return jsonify({
+            "error": "API error",
+            "message": f"Error retrieving search term data: {str(e)}",
+            "environment": ENVIRONMENT
+        }), 500
+    
+    if first is None:
+        logger.error("No search terms data returned from Google Ads API")
+        return jsonify({
+            "error": "No data available",
+            "message": "No search terms data returned from Google Ads API",
+            "environment": ENVIRONMENT
+        }), 404
+    
+    logger.info("Streaming search terms data")
+    return ndjson_response(project_row(row, fields) for row in itertools.chain([first], rows))
+
 @extended_bp.route('/keywords', methods=['GET'])
 def get_keywords():
     """
@@ -260,6 +484,9 @@ def get_keywords():
                 logger.info(f"Successfully retrieved keyword data")
                 return jsonify(real_data)
             else:
+                circuit_response = circuit_open_response()
+                if circuit_response:
+                    return circuit_response
                 logger.error("No keyword data returned from Google Ads API")
                 return jsonify({
                     "error": "No data available",
@@ -0,0 +1,241 @@
+"""
+Local SQLite Fact Store for Daily Google Ads Metrics.
+
+Daily rows of impressions, clicks, conversions and cost_micros per customer,
+campaign and ad group are kept in a SQLite database in WAL mode, so readers
+never block the writer. The rollup cube reads the stored rows of a date
+range; only days the store has not synced yet (or days synced inside the
+conversion-lag window) are fetched from the Google Ads API.
+
+When FACT_STORE_ENABLED is False the in-memory partition cache is used instead.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from partition_cache import DailyStore, COUNTER_FIELDS, days_between, partition_cache, to_date
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Use the SQLite fact store for daily metrics (otherwise the in-memory partition cache)
+try:
+    from config import FACT_STORE_ENABLED
+except ImportError:
+    FACT_STORE_ENABLED = True
+
+# Location of the SQLite database
+try:
+    from config import FACT_STORE_PATH
+except ImportError:
+    FACT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ads_facts.db')
+
+# Identity columns stored alongside the counters
+IDENTITY_FIELDS = ('campaign_id', 'campaign_name', 'campaign_status', 'ad_group_id', 'ad_group_name', 'status')
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS daily_metrics (
+        customer_id TEXT NOT NULL,
+        level TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        campaign_id TEXT,
+        campaign_name TEXT,
+        campaign_status TEXT,
+        ad_group_id TEXT,
+        ad_group_name TEXT,
+        status TEXT,
+        impressions INTEGER NOT NULL DEFAULT 0,
+        clicks INTEGER NOT NULL DEFAULT 0,
+        conversions REAL NOT NULL DEFAULT 0,
+        cost_micros INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (customer_id, level, entity_id, date)
+    );
+    CREATE INDEX IF NOT EXISTS idx_daily_metrics_customer_date ON daily_metrics (customer_id, date);
+    CREATE INDEX IF NOT EXISTS idx_daily_metrics_entity_date ON daily_metrics (entity_id, date);
+    CREATE TABLE IF NOT EXISTS synced_days (
+        customer_id TEXT NOT NULL,
+        level TEXT NOT NULL,
+        date TEXT NOT NULL,
+        synced_at REAL NOT NULL,
+        final INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (customer_id, level, date)
+    );
+"""
+
+class FactStore(DailyStore):
+    """
+    Daily Google Ads rows in SQLite.
+
+    Each thread of each process gets its own connection; writes are
+    serialized with a lock. synced_days records, per day, whether it was
+    synced after the conversion-lag window closed (see DailyStore.is_final).
+    """
+
+    def __init__(self, path=FACT_STORE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self):
+        """Get this thread's connection, creating the schema on first use and reconnecting after a fork."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if not self._schema_ready:
+                with self._write_lock:
+                    connection.executescript(SCHEMA)
+                    self._migrate(connection)
+                    self._schema_ready = True
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _migrate(self, connection):
+        """Add columns missing from databases created by earlier versions."""
+        columns = {row['name'] for row in connection.execute("PRAGMA table_info(daily_metrics)")}
+        if 'campaign_status' not in columns:
+            # Stored ad group days lack the campaign status, so they are fetched again
+            logger.info("Adding campaign_status to the fact store; ad group days will be re-synced")
+            with connection:
+                connection.execute("ALTER TABLE daily_metrics ADD COLUMN campaign_status TEXT")
+                connection.execute("DELETE FROM daily_metrics WHERE level = 'ad_group'")
+                connection.execute("DELETE FROM synced_days WHERE level = 'ad_group'")
+
+        columns = {row['name'] for row in connection.execute("PRAGMA table_info(synced_days)")}
+        if 'final' not in columns:
+            # Days synced while still inside the lag window stay non-final and are fetched again
+            logger.info("Adding final to the fact store's synced days")
+            with connection:
+                connection.execute("ALTER TABLE synced_days ADD COLUMN final INTEGER NOT NULL DEFAULT 0")
+                connection.executemany(
+                    "UPDATE synced_days SET final = 1 WHERE date = ? AND synced_at >= ?",
+                    [(row['date'], self.final_at(to_date(row['date'])))
+                     for row in connection.execute("SELECT DISTINCT date FROM synced_days").fetchall()]
+                )
+
+    def synced_times(self, customer_id, level, start_date, end_date):
+        days = days_between(start_date, end_date)
+        cursor = self._connection().execute(
+            "SELECT date, synced_at, final FROM synced_days "
+            "WHERE customer_id = ? AND level = ? AND date BETWEEN ? AND ?",
+            (customer_id, level, days[0].isoformat(), days[-1].isoformat())
+        )
+        by_iso = {day.isoformat(): day for day in days}
+        synced = {}
+        for row in cursor:
+            day = by_iso[row['date']]
+            synced[day] = (row['synced_at'], bool(row['final']))
+        return synced
+
+    def store(self, customer_id, level, start_date, end_date, rows):
+        days = days_between(start_date, end_date)
+        synced_at = time.time()
+        columns = ('customer_id', 'level', 'entity_id', 'date') + IDENTITY_FIELDS + COUNTER_FIELDS
+        values = [
+            (customer_id, level, row['entity_id'], row['date'])
+            + tuple(row.get(field) for field in IDENTITY_FIELDS)
+            + tuple(row[field] for field in COUNTER_FIELDS)
+            for row in rows
+        ]
+
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.execute(
+                "DELETE FROM daily_metrics WHERE customer_id = ? AND level = ? AND date BETWEEN ? AND ?",
+                (customer_id, level, days[0].isoformat(), days[-1].isoformat())
+            )
+            connection.executemany(
+                f"INSERT OR REPLACE INTO daily_metrics ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                values
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO synced_days (customer_id, level, date, synced_at, final) VALUES (?, ?, ?, ?, ?)",
+                [(customer_id, level, day.isoformat(), synced_at, int(self.is_final(day, synced_at))) for day in days]
+            )
+
+    def rows(self, customer_id, level, start_date, end_date):
+        cursor = self._connection().execute(
+            f"SELECT entity_id, date, {', '.join(IDENTITY_FIELDS + COUNTER_FIELDS)} FROM daily_metrics "
+            "WHERE customer_id = ? AND level = ? AND date BETWEEN ? AND ? ORDER BY date",
+            (customer_id, level, str(start_date), str(end_date))
+        )
+        return [dict(row) for row in cursor]
+
+    def purge(self, customer_id=None, level=None):
+        """
+        Remove stored rows and their sync records.
+
+        Args:
+            customer_id (str, optional): Only purge this customer's rows
+            level (str, optional): Only purge this entity level's rows
+
+        Returns:
+            int: Number of synced days removed
+        """
+        conditions, params = [], []
+        if customer_id is not None:
+            conditions.append("customer_id = ?")
+            params.append(customer_id)
+        if level is not None:
+            conditions.append("level = ?")
+            params.append(level)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.execute(f"DELETE FROM daily_metrics{where}", params)
+            purged = connection.execute(f"DELETE FROM synced_days{where}", params).rowcount
+        logger.info(f"Purged {purged} synced day(s) from the fact store")
+        return purged
+
+    def stats(self):
+        """
+        Get fact store statistics.
+
+        Returns:
+            dict: Row and synced day counts per level plus sync counters
+        """
+        connection = self._connection()
+        levels = {
+            row['level']: {'rows': row['row_count'], 'first_date': row['first_date'], 'last_date': row['last_date']}
+            for row in connection.execute(
+                "SELECT level, COUNT(*) AS row_count, MIN(date) AS first_date, MAX(date) AS last_date "
+                "FROM daily_metrics GROUP BY level"
+            )
+        }
+        for row in connection.execute("SELECT level, COUNT(*) AS day_count FROM synced_days GROUP BY level"):
+            levels.setdefault(row['level'], {'rows': 0})['synced_days'] = row['day_count']
+        with self._stats_lock:
+            sync_stats = dict(self._sync_stats)
+        return {
+            'store': 'sqlite',
+            'path': self.path,
+            'levels': levels,
+            'hot_days': self.hot_days,
+            'hot_ttl': self.hot_ttl,
+            **sync_stats
+        }
+
+# Process-wide fact store shared by all fetch functions
+fact_store = FactStore() if FACT_STORE_ENABLED else None
+
+def get_daily_store():
+    """
+    Get the store that serves daily metrics.
+
+    Returns:
+        DailyStore: The SQLite fact store, or the in-memory partition cache
+            when FACT_STORE_ENABLED is False
+    """
+    return fact_store if fact_store is not None else partition_cache
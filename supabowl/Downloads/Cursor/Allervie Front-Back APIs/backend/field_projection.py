@@ -0,0 +1,109 @@
+"""
+Field Projection for the Ads Endpoints.
+
+The ads endpoints accept `fields`, a comma-separated list of response
+fields (e.g. `?fields=search_term,impressions,clicks`). The list is
+validated against the endpoint's schema and the response objects are
+pruned to it. Fetch functions that query the API live (search terms) also
+use it to build a minimal GAQL SELECT list, see extended_google_ads_api.
+"""
+
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Response fields of each endpoint, in response order
+FIELD_SCHEMAS = {
+    'campaigns': ('id', 'name', 'status', 'impressions', 'clicks', 'cost', 'ctr'),
+    'ad_groups': ('id', 'name', 'campaign_id', 'campaign_name', 'status', 'impressions', 'clicks', 'cost', 'ctr'),
+    'search_terms': ('search_term', 'campaign_id', 'campaign_name', 'ad_group_id', 'ad_group_name',
+                     'impressions', 'clicks', 'cost', 'ctr'),
+    'performance': ('impressions', 'clicks', 'conversions', 'cost',
+                    'conversionRate', 'clickThroughRate', 'costPerConversion'),
+}
+
+class ProjectionError(ValueError):
+    """Raised for a `fields` parameter naming unknown fields."""
+
+def _in_schema_order(endpoint, fields):
+    # Canonical order, so equivalent projections share cache keys and GAQL queries
+    fields = set(fields)
+    projection = tuple(field for field in FIELD_SCHEMAS[endpoint] if field in fields)
+    # The full field set is the same as no projection
+    return None if len(projection) == len(FIELD_SCHEMAS[endpoint]) else projection
+
+def parse_fields(endpoint, args):
+    """
+    Read and validate the `fields` parameter of a request.
+
+    Args:
+        endpoint (str): Key of FIELD_SCHEMAS
+        args (MultiDict): The request's query parameters
+
+    Returns:
+        tuple: The requested fields in schema order, or None for all fields
+
+    Raises:
+        ProjectionError: If a field is not in the endpoint's schema or none is given
+    """
+    if 'fields' not in args:
+        return None
+
+    requested = [field.strip() for field in args.get('fields', '').split(',') if field.strip()]
+    if not requested:
+        raise ProjectionError("fields must name at least one field")
+
+    unknown = [field for field in requested if field not in FIELD_SCHEMAS[endpoint]]
+    if unknown:
+        raise ProjectionError(f"Unknown {endpoint} field(s): {', '.join(unknown)}. "
+                              f"Available fields: {', '.join(FIELD_SCHEMAS[endpoint])}")
+
+    return _in_schema_order(endpoint, requested)
+
+def widen(endpoint, fields, *extra):
+    """
+    Add fields a route needs internally (e.g. its sort field) to a projection.
+
+    Args:
+        endpoint (str): Key of FIELD_SCHEMAS
+        fields (tuple): Projection from parse_fields, or None for all fields
+        *extra (str): Fields to add
+
+    Returns:
+        tuple: The widened projection in schema order, or None for all fields
+    """
+    if fields is None:
+        return None
+    return _in_schema_order(endpoint, fields + extra)
+
+def project_row(row, fields):
+    """
+    Prune one response object to a projection.
+
+    Args:
+        row (dict): Response object
+        fields (tuple): Projection from parse_fields, or None for all fields
+
+    Returns:
+        dict: The pruned object (the row itself when fields is None)
+    """
+    if fields is None:
+        return row
+    return {field: row[field] for field in fields if field in row}
+
+def project_rows(rows, fields):
+    """
+    Prune a list of response objects to a projection.
+
+    Args:
+        rows (list): Response objects
+        fields (tuple): Projection from parse_fields, or None for all fields
+
+    Returns:
+        list: The pruned objects (rows itself when fields is None)
+    """
+    if fields is None:
+        return rows
+    return [project_row(row, fields) for row in rows]
@@ -0,0 +1,236 @@
+"""
+GAQL Query Executor.
+
+This module runs GAQL queries against the Google Ads API. It uses
+GoogleAdsService.search_stream by default, falls back to the paged
+GoogleAdsService.search, and yields rows incrementally so callers can
+aggregate while the response is still arriving. Rows and batches are
+recorded per query label.
+
+Independent queries can be run concurrently on a bounded thread pool;
+gRPC calls release the GIL, so request latency becomes the slowest query
+rather than the sum of all of them.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from google.ads.googleads.errors import GoogleAdsException
+from circuit_breaker import ads_circuit, is_outage_error
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Use search_stream unless disabled in config
+try:
+    from config import GAQL_USE_SEARCH_STREAM
+except ImportError:
+    GAQL_USE_SEARCH_STREAM = True
+
+# Maximum number of queries running at once across all requests
+try:
+    from config import GAQL_MAX_CONCURRENCY
+except ImportError:
+    GAQL_MAX_CONCURRENCY = 4
+
+# Default per-query deadline in seconds for concurrent execution
+try:
+    from config import GAQL_QUERY_DEADLINE
+except ImportError:
+    GAQL_QUERY_DEADLINE = 60
+
+_query_pool = ThreadPoolExecutor(max_workers=GAQL_MAX_CONCURRENCY, thread_name_prefix='gaql')
+
+# Per-label execution statistics
+_query_stats = {}
+_query_stats_lock = threading.Lock()
+
+def execute_query(client, customer_id, query, label='query', use_stream=None):
+    """
+    Execute a GAQL query and yield result rows as they arrive.
+
+    search_stream returns every row in a handful of large batches over a
+    single call, whereas search needs one round-trip per page. If the stream
+    cannot be opened (anything other than a GoogleAdsException) before the
+    first row arrives, the query is retried with paged search.
+
+    Queries go through the Google Ads circuit breaker: while it is open they
+    fail immediately, and outage errors count towards opening it.
+
+    Args:
+        client (GoogleAdsClient): Google Ads API client
+        customer_id (str): Customer ID to run the query against
+        query (str): GAQL query
+        label (str, optional): Name used for logging and statistics.
+            Defaults to 'query'.
+        use_stream (bool, optional): Override GAQL_USE_SEARCH_STREAM.
+
+    Yields:
+        GoogleAdsRow: One row of the query result
+
+    Raises:
+        CircuitOpenError: If the circuit breaker is open
+    """
+    if use_stream is None:
+        use_stream = GAQL_USE_SEARCH_STREAM
+
+    ads_circuit.before_call()
+    ga_service = client.get_service("GoogleAdsService")
+    counters = {'rows': 0, 'batches': 0}
+    mode = 'search'
+    started = time.monotonic()
+
+    try:
+        if use_stream:
+            mode = 'search_stream'
+            try:
+                for row in _stream_rows(ga_service, customer_id, query, counters):
+                    yield row
+                ads_circuit.record_success()
+                return
+            except GoogleAdsException:
+                raise
+            except Exception as stream_error:
+                # Rows already handed to the caller cannot be replayed
+                if counters['rows']:
+                    raise
+                logger.warning(f"search_stream failed for {label}: {stream_error}, falling back to search")
+                mode = 'search (stream fallback)'
+                counters['batches'] = 0
+
+        for row in _paged_rows(client, ga_service, customer_id, query, counters):
+            yield row
+        ads_circuit.record_success()
+    except Exception as query_error:
+        if is_outage_error(query_error):
+            ads_circuit.record_failure(query_error)
+        else:
+            ads_circuit.record_success()
+        raise
+    finally:
+        _record_stats(label, mode, counters, time.monotonic() - started)
+
+def _stream_rows(ga_service, customer_id, query, counters):
+    """Yield rows from search_stream, counting batches and rows."""
+    stream = ga_service.search_stream(customer_id=customer_id, query=query)
+    for batch in stream:
+        counters['batches'] += 1
+        for row in batch.results:
+            counters['rows'] += 1
+            yield row
+
+def _paged_rows(client, ga_service, customer_id, query, counters):
+    """Yield rows from paged search, counting pages as batches."""
+    try:
+        response = ga_service.search(customer_id=customer_id, query=query)
+    except TypeError as type_error:
+        # Older library versions only accept a request object
+        logger.warning(f"Direct parameter style failed: {type_error}, trying legacy style")
+        search_request = client.get_type("SearchGoogleAdsRequest")
+        search_request.customer_id = customer_id
+        search_request.query = query
+        response = ga_service.search(request=search_request)
+
+    for page in response.pages:
+        counters['batches'] += 1
+        for row in page.results:
+            counters['rows'] += 1
+            yield row
+
+def _record_stats(label, mode, counters, elapsed):
+    elapsed_ms = round(elapsed * 1000, 1)
+    logger.info(f"Query {label}: {counters['rows']} rows in {counters['batches']} batches "
+                f"via {mode} ({elapsed_ms} ms)")
+
+    with _query_stats_lock:
+        stats = _query_stats.setdefault(label, {
+            'queries': 0,
+            'rows': 0,
+            'batches': 0,
+            'stream_fallbacks': 0
+        })
+        stats['queries'] += 1
+        stats['rows'] += counters['rows']
+        stats['batches'] += counters['batches']
+        if mode == 'search (stream fallback)':
+            stats['stream_fallbacks'] += 1
+        stats['last_mode'] = mode
+        stats['last_rows'] = counters['rows']
+        stats['last_batches'] = counters['batches']
+        stats['last_duration_ms'] = elapsed_ms
+
+def get_query_stats():
+    """
+    Get execution statistics for every query label.
+
+    Returns:
+        dict: Statistics keyed by query label
+    """
+    with _query_stats_lock:
+        return {label: dict(stats) for label, stats in _query_stats.items()}
+
+class _TimedTask:
+    """A pool task that records when it starts running."""
+
+    def __init__(self, task):
+        self.task = task
+        self.started = threading.Event()
+        self.started_at = None
+
+    def __call__(self):
+        self.started_at = time.monotonic()
+        self.started.set()
+        return self.task()
+
+def run_concurrently(tasks, deadlines=None):
+    """
+    Run independent query tasks concurrently on the shared pool.
+
+    Each task is a zero-argument callable, typically a fetch function bound
+    with functools.partial. Errors are collected per task instead of
+    aborting the whole batch. Tasks must not call run_concurrently
+    themselves, or they could wait on pool slots held by their callers.
+
+    A deadline starts when its task starts running, so time spent queued
+    behind other requests' queries does not count against it. A timed-out
+    task is only abandoned: a task that is already running cannot be
+    interrupted, so it keeps its pool slot until it finishes, along with
+    any side effects (e.g. a daily store sync still writes its rows).
+
+    Args:
+        tasks (dict): Task name -> callable
+        deadlines (dict, optional): Task name -> deadline in seconds, measured
+            from the start of the task. Tasks without an entry use GAQL_QUERY_DEADLINE.
+
+    Returns:
+        tuple: (results, errors) where results maps task name -> return value
+            and errors maps task name -> error message
+    """
+    deadlines = deadlines or {}
+    started = time.monotonic()
+    timed_tasks = {name: _TimedTask(task) for name, task in tasks.items()}
+    futures = {name: _query_pool.submit(timed_task) for name, timed_task in timed_tasks.items()}
+
+    results = {}
+    errors = {}
+    for name, future in futures.items():
+        deadline = deadlines.get(name, GAQL_QUERY_DEADLINE)
+        timed_task = timed_tasks[name]
+        try:
+            # Queued time is not part of the deadline
+            timed_task.started.wait()
+            remaining = max(0, deadline - (time.monotonic() - timed_task.started_at))
+            results[name] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            errors[name] = f"Timed out after {deadline}s"
+            logger.error(f"Concurrent query {name} exceeded its {deadline}s deadline; "
+                         f"it keeps running in the background")
+        except Exception as e:
+            errors[name] = str(e)
+            logger.error(f"Concurrent query {name} failed: {e}")
+
+    logger.info(f"Ran {len(tasks)} queries concurrently in {round((time.monotonic() - started) * 1000, 1)} ms "
+                f"({len(errors)} failed)")
+    return results, errors
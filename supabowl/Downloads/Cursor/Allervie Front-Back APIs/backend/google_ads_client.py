@@ -6,61 +6,327 @@ including client creation, query execution, and data formatting.
 """
 
 import os
+import json
 import logging
+import threading
 import traceback
 from pathlib import Path
 from datetime import datetime, timedelta
 import pytz
 from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
+from gaql_executor import execute_query
+from circuit_breaker import ads_circuit, CircuitOpenError
+from account_metadata import get_default_client_account
+from request_coalescing import coalesced, single_flight
+from result_cache import cached
+from rollup_cube import get_rollup_cube
+from ads_aggregation import counter_metrics
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Enable debug logging for the Google Ads client library
+# Full request/response payload logging from the Google Ads client library is opt-in
+try:
+    from config import GOOGLE_ADS_WIRE_LOGGING
+except ImportError:
+    GOOGLE_ADS_WIRE_LOGGING = False
+
 googleads_logger = logging.getLogger('google.ads.googleads')
-googleads_logger.setLevel(logging.DEBUG)
+googleads_logger.setLevel(logging.DEBUG if GOOGLE_ADS_WIRE_LOGGING else logging.WARNING)
+
+# Process-wide registry of constructed clients.
+# Keys are config identities: (yaml path, yaml mtime, api_version). Rewriting the
+# YAML file changes its mtime, so a rotated refresh token never hits a stale client.
+_client_registry = {}
+_client_registry_lock = threading.RLock()
+
+# API versions that are known to work, keyed by (yaml path, yaml mtime).
+# Mirrored to a small state file next to the credentials so restarts skip
+# the fallback walk until the YAML changes.
+API_VERSION_STATE_FILE = '.api_version_state.json'
+_negotiated_versions = {}
+
+def _get_environment():
+    """Return the configured environment, defaulting to production."""
+    try:
+        from config import ENVIRONMENT
+        return ENVIRONMENT
+    except ImportError:
+        return "production"
+
+def find_google_ads_yaml():
+    """
+    Locate the google-ads.yaml file.
+    
+    Returns:
+        str: Path of the first google-ads.yaml found
+        None: If no configuration file exists
+    """
+    # Try different locations for the google-ads.yaml file
+    possible_paths = [
+        Path(__file__).parent.parent / "credentials" / "google-ads.yaml",  # Parent credentials directory
+        Path(__file__).parent / "google-ads.yaml",  # Current directory
+        Path.cwd() / "credentials" / "google-ads.yaml",  # Working directory credentials
+        Path.cwd() / "google-ads.yaml",  # Working directory
+    ]
+    
+    # Check each path and use the first one that exists
+    for path in possible_paths:
+        if path.exists():
+            return str(path)
+    return None
 
-def get_google_ads_client():
+def get_google_ads_client(force_new=False):
     """
-    Creates and returns a Google Ads API client.
+    Returns the pooled Google Ads API client for the current configuration.
     
-    Loads the client configuration from the google-ads.yaml file
-    in various possible locations.
+    The client is built once per config identity (YAML path + mtime + api_version)
+    and shared by every request thread in the process. A new client is only
+    constructed when the YAML file changes, when the registry has been
+    invalidated, or when force_new is True. Construction goes through the
+    Google Ads circuit breaker, so while it is open no rebuild is attempted.
+    It makes network calls (API version checks), so it runs outside the
+    registry lock; concurrent callers for the same file revision share one build.
+    
+    Args:
+        force_new (bool, optional): Build a fresh client even if one is pooled.
+            Defaults to False.
     
     Returns:
         GoogleAdsClient: Configured client for Google Ads API
         None: If client creation fails
     """
+    ENVIRONMENT = _get_environment()
+    
+    yaml_path = find_google_ads_yaml()
+    if not yaml_path:
+        logger.error("google-ads.yaml not found in any of the expected locations")
+        return None
+    
     try:
-        # Try to import the environment setting
-        try:
-            from config import ENVIRONMENT
-            logger.info(f"Current environment: {ENVIRONMENT}")
-        except ImportError:
-            ENVIRONMENT = "production"
-            logger.info(f"Defaulting to environment: {ENVIRONMENT}")
-        
-        # Try different locations for the google-ads.yaml file
-        possible_paths = [
-            Path(__file__).parent.parent / "credentials" / "google-ads.yaml",  # Parent credentials directory
-            Path(__file__).parent / "google-ads.yaml",  # Current directory
-            Path.cwd() / "credentials" / "google-ads.yaml",  # Working directory credentials
-            Path.cwd() / "google-ads.yaml",  # Working directory
-        ]
-        
-        yaml_path = None
-        # Check each path and use the first one that exists
-        for path in possible_paths:
-            if path.exists():
-                yaml_path = str(path)
-                logger.info(f"Found google-ads.yaml at: {yaml_path}")
-                break
+        yaml_mtime = os.path.getmtime(yaml_path)
+    except OSError as stat_error:
+        logger.error(f"Could not stat {yaml_path}: {stat_error}")
+        return None
+    
+    if not force_new:
+        client = _pooled_client(yaml_path, yaml_mtime)
+        if client is not None:
+            return client
+    
+    return single_flight.do(('google_ads_client', yaml_path, yaml_mtime),
+                            lambda: _build_pooled_client(yaml_path, yaml_mtime, ENVIRONMENT, force_new))
+
+def _pooled_client(yaml_path, yaml_mtime):
+    """Return the pooled client for a revision of google-ads.yaml, or None."""
+    with _client_registry_lock:
+        for identity, client in _client_registry.items():
+            if identity[:2] == (yaml_path, yaml_mtime):
+                return client
+    return None
+
+def _build_pooled_client(yaml_path, yaml_mtime, ENVIRONMENT, force_new):
+    """
+    Build a client and publish it to the registry.
+    
+    Args:
+        yaml_path (str): Path to google-ads.yaml
+        yaml_mtime (float): Modification time of google-ads.yaml
+        ENVIRONMENT (str): Current environment; production re-raises errors
+        force_new (bool): Build even if a client for this revision is pooled
+    
+    Returns:
+        GoogleAdsClient: The new client, or None if creation failed
+    """
+    # A build that finished just before this one started may already have published
+    if not force_new:
+        client = _pooled_client(yaml_path, yaml_mtime)
+        if client is not None:
+            return client
+    
+    try:
+        ads_circuit.before_call()
+    except CircuitOpenError as circuit_error:
+        logger.warning(f"Not building a Google Ads client: {circuit_error}")
+        return None
+    
+    try:
+        client, api_version = _build_google_ads_client(yaml_path, yaml_mtime, ENVIRONMENT)
+    except Exception as build_error:
+        ads_circuit.record_failure(build_error)
+        raise
+    if client is None:
+        ads_circuit.record_failure("Failed to create Google Ads client")
+        return None
+    
+    with _client_registry_lock:
+        # The file changed again while this client was being built: keep the newer client
+        if any(i[0] == yaml_path and i[1] > yaml_mtime for i in _client_registry):
+            return client
         
-        if not yaml_path:
-            logger.error("google-ads.yaml not found in any of the expected locations")
-            return None
+        # Drop clients built from older revisions of the same file
+        for identity in [i for i in _client_registry if i[0] == yaml_path]:
+            del _client_registry[identity]
+        _client_registry[(yaml_path, yaml_mtime, api_version)] = client
+    logger.info(f"Registered pooled Google Ads client for {yaml_path} (API {api_version})")
+    return client
+
+def invalidate_google_ads_client(yaml_path=None):
+    """
+    Drop pooled Google Ads clients so the next request rebuilds them.
+    
+    Called when the token manager rotates credentials.
+    
+    Args:
+        yaml_path (str, optional): Only drop clients built from this file.
+            Defaults to None (drop all clients).
+    
+    Returns:
+        int: Number of clients removed from the registry
+    """
+    with _client_registry_lock:
+        stale = [i for i in _client_registry if yaml_path is None or i[0] == str(yaml_path)]
+        for identity in stale:
+            del _client_registry[identity]
+    if stale:
+        logger.info(f"Invalidated {len(stale)} pooled Google Ads client(s)")
+    return len(stale)
+
+def _api_version_state_path(yaml_path):
+    """Return the path of the negotiated API version state file for a YAML file."""
+    return Path(yaml_path).parent / API_VERSION_STATE_FILE
+
+def get_negotiated_api_version(yaml_path, yaml_mtime):
+    """
+    Look up the API version previously negotiated for this YAML revision.
+    
+    Args:
+        yaml_path (str): Path to google-ads.yaml
+        yaml_mtime (float): Modification time of google-ads.yaml
+    
+    Returns:
+        str: The negotiated API version (e.g. 'v19')
+        None: If no version has been negotiated for this revision of the file
+    """
+    identity = (yaml_path, yaml_mtime)
+    if identity in _negotiated_versions:
+        return _negotiated_versions[identity]
+    
+    try:
+        with open(_api_version_state_path(yaml_path), 'r') as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+    
+    # The state is only valid for the exact YAML revision it was negotiated against
+    if state.get('yaml_path') != yaml_path or state.get('yaml_mtime') != yaml_mtime:
+        return None
+    
+    _negotiated_versions[identity] = state.get('api_version')
+    return _negotiated_versions[identity]
+
+def record_negotiated_api_version(yaml_path, yaml_mtime, api_version):
+    """
+    Record a working API version in memory and in the state file.
+    
+    Args:
+        yaml_path (str): Path to google-ads.yaml
+        yaml_mtime (float): Modification time of google-ads.yaml
+        api_version (str): API version that produced a working client
+    """
+    _negotiated_versions[(yaml_path, yaml_mtime)] = api_version
+    
+    state = {
+        'yaml_path': yaml_path,
+        'yaml_mtime': yaml_mtime,
+        'api_version': api_version,
+        'negotiated_at': datetime.now().isoformat()
+    }
+    try:
+        with open(_api_version_state_path(yaml_path), 'w') as state_file:
+            json.dump(state, state_file, indent=2)
+        logger.info(f"Recorded negotiated Google Ads API version {api_version}")
+    except OSError as e:
+        logger.warning(f"Could not write API version state file: {e}")
+
+def forget_negotiated_api_version(yaml_path, yaml_mtime):
+    """Discard a negotiated API version that no longer works."""
+    _negotiated_versions.pop((yaml_path, yaml_mtime), None)
+    try:
+        os.remove(_api_version_state_path(yaml_path))
+    except OSError:
+        pass
+
+def _api_version_works(client, api_version):
+    """
+    Check that the API serves a version before it is recorded as negotiated.
+    
+    Constructing a client never contacts the API, so a retired version would
+    otherwise be persisted and reused on every start. Listing the accessible
+    customers is the cheapest authenticated call and needs no customer ID.
+    
+    Args:
+        client (GoogleAdsClient): Client loaded with the version
+        api_version (str): The version being checked
+    
+    Returns:
+        bool: True if the API answered with this version
+    """
+    try:
+        client.get_service('CustomerService').list_accessible_customers()
+        return True
+    except Exception as e:
+        logger.warning(f"API version {api_version} did not answer a test call: {e}")
+        return False
+
+def resolve_api_version():
+    """
+    Negotiate the Google Ads API version ahead of the first request.
+    
+    Builds (and pools) the client so the fallback chain is walked at most once
+    at startup rather than inside a request.
+    
+    Returns:
+        str: The negotiated API version
+        None: If no client could be created
+    """
+    try:
+        client = get_google_ads_client()
+    except Exception as e:
+        logger.error(f"Startup API version negotiation failed: {e}")
+        return None
+    
+    if not client:
+        logger.error("Startup API version negotiation failed: no client")
+        return None
+    
+    with _client_registry_lock:
+        for identity, pooled_client in _client_registry.items():
+            if pooled_client is client:
+                logger.info(f"Negotiated Google Ads API version at startup: {identity[2]}")
+                return identity[2]
+    return None
+
+def _build_google_ads_client(yaml_path, yaml_mtime, ENVIRONMENT):
+    """
+    Creates a Google Ads API client from the given google-ads.yaml file.
+    
+    If an API version has already been negotiated for this revision of the
+    file, it is used directly instead of walking the fallback chain.
+    
+    Args:
+        yaml_path (str): Path to google-ads.yaml
+        yaml_mtime (float): Modification time of google-ads.yaml
+        ENVIRONMENT (str): Current environment; production re-raises errors
+    
+    Returns:
+        tuple: (GoogleAdsClient, api_version) on success, (None, None) on failure
+    """
+    try:
+        logger.info(f"Current environment: {ENVIRONMENT}")
+        logger.info(f"Found google-ads.yaml at: {yaml_path}")
         
         # Explicitly check and print YAML file contents (without sensitive info)
         try:
@@ -81,16 +347,21 @@ def get_google_ads_client():
                     
                     if ENVIRONMENT == "production":
                         raise ValueError(error_msg)
-                    return None
+                    return None, None
                     
         except Exception as yaml_error:
             logger.error(f"Error reading YAML file: {yaml_error}")
             if ENVIRONMENT == "production":
                 raise
-            return None
+            return None, None
         
-        # Load the client with the API version from the YAML file, defaulting to v14
-        api_version = config.get('api_version', 'v14') if config else 'v14'
+        # Load the client with the API version from the YAML file, defaulting to v14,
+        # unless a working version was already negotiated for this file revision
+        configured_version = config.get('api_version', 'v14') if config else 'v14'
+        negotiated_version = get_negotiated_api_version(yaml_path, yaml_mtime)
+        api_version = negotiated_version or configured_version
+        if negotiated_version:
+            logger.info(f"Using previously negotiated API version {negotiated_version}")
         
         try:
             client = GoogleAdsClient.load_from_storage(yaml_path, version=api_version)
@@ -101,7 +372,7 @@ def get_google_ads_client():
                 logger.error(error_msg)
                 if ENVIRONMENT == "production":
                     raise ValueError(error_msg)
-                return None
+                return None, None
                 
             logger.info(f"Successfully loaded Google Ads client with API version {api_version}")
             logger.info(f"Client type: {type(client).__name__}")
@@ -112,65 +383,57 @@ def get_google_ads_client():
                 logger.error(error_msg)
                 if ENVIRONMENT == "production":
                     raise ValueError(error_msg)
-                return None
+                return None, None
                 
             # Try to get a service to verify the client works
             try:
                 service = client.get_service('GoogleAdsService')
                 logger.info(f"Successfully got GoogleAdsService: {type(service).__name__}")
-                
-                # Test the service with a simple query
-                test_query = """
-                    SELECT customer.id
-                    FROM customer
-                    LIMIT 1
-                """
-                try:
-                    service.search(
-                        customer_id=config['login_customer_id'],
-                        query=test_query
-                    )
-                    logger.info("Successfully executed test query")
-                except Exception as query_error:
-                    logger.error(f"Test query failed: {query_error}")
-                    if ENVIRONMENT == "production":
-                        raise
-                    return None
                     
             except Exception as service_error:
                 logger.error(f"Error getting GoogleAdsService: {service_error}")
                 if ENVIRONMENT == "production":
                     raise
-                return None
+                return None, None
                 
-            return client
+            # A version the library can load may still be sunset: fall back if the API rejects it
+            if not _api_version_works(client, api_version):
+                raise ValueError(f"API version {api_version} failed its test call")
+            if not negotiated_version:
+                record_negotiated_api_version(yaml_path, yaml_mtime, api_version)
+            return client, api_version
         except Exception as e:
             logger.error(f"Failed to create client with API version {api_version}: {e}")
+            if negotiated_version:
+                forget_negotiated_api_version(yaml_path, yaml_mtime)
             
             # Fall back to try alternative versions
-            fallback_versions = ['v19', 'v18', 'v17']
+            fallback_versions = [v for v in [configured_version, 'v19', 'v18', 'v17'] if v != api_version]
             for version in fallback_versions:
                 try:
                     logger.info(f"Trying fallback to API version {version}")
                     client = GoogleAdsClient.load_from_storage(yaml_path, version=version)
-                    if client and hasattr(client, 'get_service'):
+                    if client and _api_version_works(client, version):
                         logger.info(f"Fallback to {version} successful!")
-                        return client
+                        record_negotiated_api_version(yaml_path, yaml_mtime, version)
+                        return client, version
                 except Exception:
                     continue  # Try next version
                     
             logger.error("All fallback version attempts failed")
             if ENVIRONMENT == "production":
                 raise ValueError("Failed to create Google Ads client with any API version")
-            return None
+            return None, None
     except Exception as e:
         logger.error(f"Error getting Google Ads client: {e}")
         logger.error(traceback.format_exc())
         if ENVIRONMENT == "production":
             raise
-        return None
+        return None, None
 
-def get_ads_performance(start_date=None, end_date=None, previous_period=False):
+@cached('ads_performance')
+@coalesced('ads_performance')
+def get_ads_performance(start_date=None, end_date=None, previous_period=False, level='customer'):
     """
     Fetches performance metrics from Google Ads API for the specified date range.
     
@@ -187,12 +450,20 @@ def get_ads_performance(start_date=None, end_date=None, previous_period=False):
         previous_period (bool, optional): If True, fetch data for the previous
             period of the same length and calculate percentage changes. 
             Defaults to False.
+        level (str, optional): 'customer' queries account totals of the additive
+            counters (one row per day at most) and derives the rates from the sums.
+            'campaign' pulls every campaign row with the API's rate metrics and
+            re-weights them, for breakdown views. Defaults to 'customer'.
     
     Returns:
         dict: Performance metrics for the specified period with values and percentage changes.
               Each metric includes a 'value' and 'change' field.
         None: If the request fails
     """
+    if level not in ('customer', 'campaign'):
+        logger.error(f"Invalid performance level: {level}. Must be 'customer' or 'campaign'")
+        return None
+    
     # Get Google Ads client
     client = get_google_ads_client()
     if not client:
@@ -250,55 +521,69 @@ def get_ads_performance(start_date=None, end_date=None, previous_period=False):
             logger.info(f"Using client account ID from config: {customer_id}")
         except ImportError:
             logger.warning("CLIENT_CUSTOMER_ID not found in config, using first non-manager account")
-            # If no client ID is configured, try to find a non-manager account
-            try:
-                customer_service = client.get_service('CustomerService')
-                response = customer_service.list_accessible_customers()
-                
-                # Find first non-manager account (any account other than the login account)
-                for resource_name in response.resource_names:
-                    account_id = resource_name.split('/')[-1]
-                    if account_id != manager_id:
-                        customer_id = account_id
-                        logger.info(f"Using first non-manager account found: {customer_id}")
-                        break
-                else:
-                    logger.error("No non-manager accounts found")
-                    return None
-            except Exception as e:
-                logger.error(f"Error finding client accounts: {e}")
+            # Accessible accounts come from the account metadata cache, not a per-request API call
+            customer_id = get_default_client_account(client)
+            if not customer_id:
+                logger.error("No non-manager accounts found")
                 return None
+            logger.info(f"Using first non-manager account found: {customer_id}")
         
-        # Create Google Ads query with enhanced metrics for v19 API
-        query = f"""
-            SELECT 
-                metrics.impressions, 
-                metrics.clicks, 
-                metrics.conversions, 
-                metrics.cost_micros,
-                metrics.ctr,
-                metrics.all_conversions_from_interactions_rate,
-                metrics.cost_per_conversion
-            FROM campaign
-            WHERE segments.date BETWEEN '{start_date}' AND '{end_date}'
-        """
+        # With previous_period the data spans both windows and is split locally by
+        # segments.date, so a single round-trip covers the comparison.
+        query_start_date = prev_start_date if previous_period else start_date
         
-        logger.debug(f"Query: {query}")
+        # Process the response into one bucket per period
+        current_totals = _new_period_totals()
+        prev_totals = _new_period_totals()
         
-        # Get the service and execute query
-        ga_service = client.get_service("GoogleAdsService")
-        if not ga_service:
-            logger.error("Failed to get GoogleAdsService")
-            return None
-            
-        logger.info("Successfully got GoogleAdsService")
-        
-        # Execute the query with proper error handling
+        # Execute the query with proper error handling, aggregating rows as they stream in
         try:
-            search_response = ga_service.search(
-                customer_id=customer_id,  # Use the client account ID, not the manager ID
-                query=query
-            )
+            if level == 'customer':
+                # Account totals are summed from the campaign x day rows of the rollup cube
+                # that also serves /campaigns and /ad_groups, so one sync covers all three
+                # views. Every campaign counts, including ones without ad groups (Performance
+                # Max). Only days the fact store has not synced and days inside the
+                # conversion-lag window are queried.
+                cube = get_rollup_cube(client, customer_id, query_start_date, end_date)
+                
+                # Each period is summed from the cube's daily account cells
+                for row in cube.rollup('customer', start_date, end_date):
+                    _add_counter_row_to_period_totals(current_totals, counter_metrics(row))
+                if previous_period:
+                    for row in cube.rollup('customer', prev_start_date, prev_end_date):
+                        _add_counter_row_to_period_totals(prev_totals, counter_metrics(row))
+            else:
+                date_field = "segments.date," if previous_period else ""
+                
+                # Create Google Ads query with enhanced metrics for v19 API
+                query = f"""
+                    SELECT 
+                        {date_field}
+                        metrics.impressions, 
+                        metrics.clicks, 
+                        metrics.conversions, 
+                        metrics.cost_micros,
+                        metrics.ctr,
+                        metrics.all_conversions_from_interactions_rate,
+                        metrics.cost_per_conversion
+                    FROM campaign
+                    WHERE segments.date BETWEEN '{query_start_date}' AND '{end_date}'
+                """
+                logger.debug(f"Query: {query}")
+                
+                search_response = execute_query(
+                    client,
+                    customer_id,  # Use the client account ID, not the manager ID
+                    query,
+                    label=f'ads_performance_{level}'
+                )
+                
+                # Process each row in the response (dates are YYYY-MM-DD, so they compare as strings)
+                for row in search_response:
+                    if not previous_period or row.segments.date >= start_date:
+                        _add_row_to_period_totals(current_totals, row.metrics)
+                    else:
+                        _add_row_to_period_totals(prev_totals, row.metrics)
             logger.info("Successfully executed search query")
         except GoogleAdsException as google_ads_error:
             logger.error(f"Google Ads API error: {google_ads_error}")
@@ -307,35 +592,13 @@ def get_ads_performance(start_date=None, end_date=None, previous_period=False):
             logger.error(f"Error executing search query: {e}")
             return None
         
-        # Process the response
-        total_impressions = 0
-        total_clicks = 0
-        total_conversions = 0
-        total_cost_micros = 0
-        total_weighted_ctr = 0
-        total_weighted_conv_rate = 0
-        total_weighted_cost_per_conv = 0
-        
-        # Process each row in the response
-        for row in search_response:
-            metrics = row.metrics
-            total_impressions += metrics.impressions
-            total_clicks += metrics.clicks
-            total_conversions += metrics.conversions
-            total_cost_micros += metrics.cost_micros
-            
-            # Calculate weighted rate metrics
-            if metrics.impressions > 0:
-                total_weighted_ctr += metrics.ctr * metrics.impressions
-            if metrics.clicks > 0:
-                total_weighted_conv_rate += metrics.all_conversions_from_interactions_rate * metrics.clicks
-            if metrics.conversions > 0:
-                total_weighted_cost_per_conv += metrics.cost_per_conversion * metrics.conversions
+        total_impressions = current_totals["impressions"]
+        total_clicks = current_totals["clicks"]
+        total_conversions = current_totals["conversions"]
+        total_cost_micros = current_totals["cost_micros"]
         
         # Calculate averages and format metrics
-        avg_ctr = (total_weighted_ctr / total_impressions) if total_impressions > 0 else 0
-        avg_conv_rate = (total_weighted_conv_rate / total_clicks) if total_clicks > 0 else 0
-        avg_cost_per_conv = (total_weighted_cost_per_conv / total_conversions) if total_conversions > 0 else 0
+        avg_ctr, avg_conv_rate, avg_cost_per_conv = _period_rates(current_totals)
         total_cost = total_cost_micros / 1_000_000  # Convert micros to actual currency
         
         # Format the response with only real data from the API
@@ -364,82 +627,44 @@ def get_ads_performance(start_date=None, end_date=None, previous_period=False):
         if total_conversions > 0 and avg_cost_per_conv is not None:
             current_period_data["costPerConversion"] = avg_cost_per_conv
         
-        # If previous period data is requested, fetch it
+        # If previous period data is requested, compare against its bucket
         if previous_period:
-            prev_query = query.replace(start_date, prev_start_date).replace(end_date, prev_end_date)
             try:
-                prev_response = ga_service.search(
-                    customer_id=customer_id,  # Use the client account ID, not the manager ID
-                    query=prev_query
-                )
-                
-                # Process previous period data similarly
-                prev_metrics = {
-                    "impressions": 0,
-                    "clicks": 0,
-                    "conversions": 0,
-                    "cost_micros": 0,
-                    "weighted_ctr": 0,
-                    "weighted_conv_rate": 0,
-                    "weighted_cost_per_conv": 0
-                }
-                
-                for row in prev_response:
-                    metrics = row.metrics
-                    prev_metrics["impressions"] += metrics.impressions
-                    prev_metrics["clicks"] += metrics.clicks
-                    prev_metrics["conversions"] += metrics.conversions
-                    prev_metrics["cost_micros"] += metrics.cost_micros
-                    
-                    if metrics.impressions > 0:
-                        prev_metrics["weighted_ctr"] += metrics.ctr * metrics.impressions
-                    if metrics.clicks > 0:
-                        prev_metrics["weighted_conv_rate"] += metrics.all_conversions_from_interactions_rate * metrics.clicks
-                    if metrics.conversions > 0:
-                        prev_metrics["weighted_cost_per_conv"] += metrics.cost_per_conversion * metrics.conversions
-                
-                # Calculate percentage changes
-                def calc_change(current, previous):
-                    if previous == 0:
-                        return 0 if current == 0 else 100
-                    return ((current - previous) / previous) * 100
+                prev_ctr, prev_conv_rate, prev_cost_per_conv = _period_rates(prev_totals)
                 
                 result = {
                     "impressions": {
                         "value": current_period_data["impressions"],
-                        "change": calc_change(current_period_data["impressions"], prev_metrics["impressions"])
+                        "change": calculate_percentage_change(current_period_data["impressions"], prev_totals["impressions"])
                     },
                     "clicks": {
                         "value": current_period_data["clicks"],
-                        "change": calc_change(current_period_data["clicks"], prev_metrics["clicks"])
+                        "change": calculate_percentage_change(current_period_data["clicks"], prev_totals["clicks"])
                     },
                     "conversions": {
                         "value": current_period_data["conversions"],
-                        "change": calc_change(current_period_data["conversions"], prev_metrics["conversions"])
+                        "change": calculate_percentage_change(current_period_data["conversions"], prev_totals["conversions"])
                     },
                     "cost": {
                         "value": current_period_data["cost"],
-                        "change": calc_change(current_period_data["cost"], prev_metrics["cost_micros"] / 1_000_000)
+                        "change": calculate_percentage_change(current_period_data["cost"], prev_totals["cost_micros"] / 1_000_000)
                     },
                     "conversionRate": {
                         "value": current_period_data["conversionRate"],
-                        "change": calc_change(current_period_data["conversionRate"], 
-                                           (prev_metrics["weighted_conv_rate"] / prev_metrics["clicks"]) if prev_metrics["clicks"] > 0 else 0)
+                        "change": calculate_percentage_change(current_period_data["conversionRate"], prev_conv_rate)
                     },
                     "clickThroughRate": {
                         "value": current_period_data["clickThroughRate"],
-                        "change": calc_change(current_period_data["clickThroughRate"],
-                                           (prev_metrics["weighted_ctr"] / prev_metrics["impressions"]) if prev_metrics["impressions"] > 0 else 0)
+                        "change": calculate_percentage_change(current_period_data["clickThroughRate"], prev_ctr)
                     },
                     "costPerConversion": {
                         "value": current_period_data["costPerConversion"],
-                        "change": calc_change(current_period_data["costPerConversion"],
-                                           (prev_metrics["weighted_cost_per_conv"] / prev_metrics["conversions"]) if prev_metrics["conversions"] > 0 else 0)
+                        "change": calculate_percentage_change(current_period_data["costPerConversion"], prev_cost_per_conv)
                     }
                 }
             except Exception as prev_error:
-                logger.error(f"Error fetching previous period data: {prev_error}")
-                # Return current period data without changes if previous period fails
+                logger.error(f"Error comparing previous period data: {prev_error}")
+                # Return current period data without changes if the comparison fails
                 result = {metric: {"value": value, "change": 0} 
                          for metric, value in current_period_data.items()}
         else:
@@ -455,6 +680,68 @@ def get_ads_performance(start_date=None, end_date=None, previous_period=False):
         logger.error(traceback.format_exc())
         return None
 
+def _new_period_totals():
+    """Create an empty accumulator for one reporting period."""
+    return {
+        "impressions": 0,
+        "clicks": 0,
+        "conversions": 0,
+        "cost_micros": 0,
+        "weighted_ctr": 0,
+        "weighted_conv_rate": 0,
+        "weighted_cost_per_conv": 0
+    }
+
+def _add_row_to_period_totals(totals, metrics):
+    """
+    Add one API row to a period accumulator.
+    
+    Rate metrics are weighted by their denominators so they can be averaged
+    across rows: CTR by impressions, conversion rate by clicks and cost per
+    conversion by conversions.
+    """
+    totals["impressions"] += metrics.impressions
+    totals["clicks"] += metrics.clicks
+    totals["conversions"] += metrics.conversions
+    totals["cost_micros"] += metrics.cost_micros
+    
+    if metrics.impressions > 0:
+        totals["weighted_ctr"] += metrics.ctr * metrics.impressions
+    if metrics.clicks > 0:
+        totals["weighted_conv_rate"] += metrics.all_conversions_from_interactions_rate * metrics.clicks
+    if metrics.conversions > 0:
+        totals["weighted_cost_per_conv"] += metrics.cost_per_conversion * metrics.conversions
+
+def _add_counter_row_to_period_totals(totals, metrics):
+    """
+    Add one customer-level row of additive counters to a period accumulator.
+    
+    The weighted sums are filled with the counters they reduce to
+    (ctr * impressions == clicks, conversion rate * clicks == conversions,
+    cost per conversion * conversions == cost_micros), so _period_rates
+    derives the rates from the summed counters.
+    """
+    totals["impressions"] += metrics.impressions
+    totals["clicks"] += metrics.clicks
+    totals["conversions"] += metrics.conversions
+    totals["cost_micros"] += metrics.cost_micros
+    
+    totals["weighted_ctr"] += metrics.clicks
+    totals["weighted_conv_rate"] += metrics.conversions
+    totals["weighted_cost_per_conv"] += metrics.cost_micros
+
+def _period_rates(totals):
+    """
+    Calculate the weighted average rate metrics for a period accumulator.
+    
+    Returns:
+        tuple: (ctr, conversion rate, cost per conversion)
+    """
+    ctr = (totals["weighted_ctr"] / totals["impressions"]) if totals["impressions"] > 0 else 0
+    conv_rate = (totals["weighted_conv_rate"] / totals["clicks"]) if totals["clicks"] > 0 else 0
+    cost_per_conv = (totals["weighted_cost_per_conv"] / totals["conversions"]) if totals["conversions"] > 0 else 0
+    return ctr, conv_rate, cost_per_conv
+
 def calculate_percentage_change(current, previous):
     """
     Calculate the percentage change between two values.
@@ -13,7 +13,7 @@ from datetime import datetime, timedelta
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def get_ads_performance_with_fallback(start_date=None, end_date=None, previous_period=False):
+def get_ads_performance_with_fallback(start_date=None, end_date=None, previous_period=False, level='customer'):
     """
     Get Google Ads performance data from the real API.
     
@@ -24,6 +24,8 @@ def get_ads_performance_with_fallback(start_date=None, end_date=None, previous_p
         start_date (str, optional): Start date in YYYY-MM-DD format.
         end_date (str, optional): End date in YYYY-MM-DD format.
         previous_period (bool, optional): If True, include previous period data.
+        level (str, optional): 'customer' for account totals or 'campaign' to
+            aggregate campaign rows. Defaults to 'customer'.
     
     Returns:
         dict: Performance data from the real API.
@@ -40,7 +42,7 @@ def get_ads_performance_with_fallback(start_date=None, end_date=None, previous_p
         logger.info(f"Getting real Google Ads performance data in {ENVIRONMENT} environment")
         
         try:
-            real_data = get_ads_performance(start_date, end_date, previous_period)
+            real_data = get_ads_performance(start_date, end_date, previous_period, level)
             
             if real_data:
                 # Validate the data structure
@@ -99,10 +101,11 @@ def get_campaign_performance_with_fallback(start_date=None, end_date=None):
     try:
         # Try to import the real campaign performance function
         from extended_google_ads_api import get_campaign_performance
+        from google_ads_client import get_google_ads_client
         
         # Try to get real campaign data
         try:
-            campaigns = get_campaign_performance(start_date, end_date)
+            campaigns = get_campaign_performance(get_google_ads_client(), start_date=start_date, end_date=end_date)
             if campaigns:
                 logger.info(f"Successfully retrieved {len(campaigns)} real campaigns")
                 return campaigns
@@ -0,0 +1,166 @@
+"""
+HTTP Caching for the JSON API.
+
+Every successful GET response under /api/ gets a content-hash ETag and a
+Cache-Control header, and is turned into a 304 Not Modified when the
+client's If-None-Match matches.
+
+Routes backed by the result cache go further: their ETag is derived from the
+cache entry's content hash, so not_modified() can answer a conditional
+request before the route runs its fetch function or serializes anything.
+"""
+
+import hashlib
+import logging
+
+from flask import request, make_response
+from werkzeug.http import quote_etag
+
+from result_cache import describe_entry, pop_freshness
+from ndjson_streaming import wants_ndjson
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Responses carry user-specific data: only the browser may keep them, and it must revalidate
+try:
+    from config import API_CACHE_CONTROL
+except ImportError:
+    API_CACHE_CONTROL = 'private, no-cache'
+
+def _request_etag(entry_etag):
+    """
+    Derive the ETag of the current request from a cache entry's content hash.
+
+    The path and query string are mixed in because the same entry can be
+    rendered differently by different routes and parameters, and so is the
+    representation (JSON or streamed NDJSON).
+    """
+    representation = 'ndjson' if wants_ndjson() else 'json'
+    return hashlib.sha1(f"{entry_etag}:{request.full_path}:{representation}".encode('utf-8')).hexdigest()
+
+def _headers_for(freshness):
+    return {
+        'ETag': quote_etag(_request_etag(freshness['etag'])),
+        'Cache-Control': API_CACHE_CONTROL,
+        'X-Data-As-Of': freshness['as_of'],
+        'X-Data-Stale': 'true' if freshness['stale'] else 'false'
+    }
+
+def freshness_headers():
+    """
+    Build response headers for the last cached result served on this thread.
+
+    Returns:
+        dict: ETag, Cache-Control, X-Data-As-Of and X-Data-Stale headers
+            (empty if no cached result was served)
+    """
+    freshness = pop_freshness()
+    if freshness is None:
+        return {}
+    return _headers_for(freshness)
+
+def _combine(freshnesses):
+    """Combine the freshness of several cache entries: the oldest as_of, stale if any part is."""
+    return {
+        'as_of': min(freshness['as_of'] for freshness in freshnesses),
+        'stale': any(freshness['stale'] for freshness in freshnesses),
+        'etag': hashlib.sha1(':'.join(freshness['etag'] for freshness in freshnesses).encode('utf-8')).hexdigest()
+    }
+
+def _not_modified_response(freshness):
+    """Return a 304 response if If-None-Match matches, otherwise None."""
+    # Weak comparison: compressed responses carry the weak form of the ETag (see compression)
+    if not request.if_none_match.contains_weak(_request_etag(freshness['etag'])):
+        return None
+
+    logger.debug("Answered %s with 304 from the result cache", request.path)
+    response = make_response('', 304)
+    response.headers.update(_headers_for(freshness))
+    return response
+
+def compound_freshness_headers(freshnesses):
+    """
+    Build response headers for a response assembled from several cached results.
+
+    Args:
+        freshnesses (list): pop_freshness() results of each part (None entries are skipped)
+
+    Returns:
+        dict: ETag over every part, Cache-Control, X-Data-As-Of of the oldest part
+            and X-Data-Stale if any part is stale (empty if no part was cached)
+    """
+    freshnesses = [freshness for freshness in freshnesses if freshness]
+    if not freshnesses:
+        return {}
+    return _headers_for(_combine(freshnesses))
+
+def compound_not_modified(*calls):
+    """
+    Answer a conditional request for a compound response from the result cache.
+
+    Args:
+        *calls: (fetch_fn, args, kwargs) tuples, in the order the route combines them
+
+    Returns:
+        Response: A 304 response if every part is fresh in the cache and
+            If-None-Match matches their combined ETag, otherwise None
+    """
+    if not request.if_none_match:
+        return None
+
+    freshnesses = []
+    for fetch_fn, args, kwargs in calls:
+        entry = fetch_fn.peek(*args, **kwargs) if hasattr(fetch_fn, 'peek') else None
+        if entry is None:
+            return None
+        freshnesses.append(describe_entry(entry))
+    return _not_modified_response(_combine(freshnesses))
+
+def not_modified(fetch_fn, *args, **kwargs):
+    """
+    Answer a conditional request from the result cache without fetching.
+
+    Args:
+        fetch_fn (callable): A fetch function decorated with result_cache.cached
+        *args, **kwargs: The arguments the route would call fetch_fn with
+
+    Returns:
+        Response: A 304 response if If-None-Match matches the fresh cache entry,
+            otherwise None (the route should run normally)
+    """
+    if not request.if_none_match or not hasattr(fetch_fn, 'peek'):
+        return None
+
+    entry = fetch_fn.peek(*args, **kwargs)
+    if entry is None:
+        return None
+    return _not_modified_response(describe_entry(entry))
+
+def add_conditional_headers(response):
+    """
+    after_request hook adding ETag/Cache-Control and handling If-None-Match.
+
+    Only successful, non-streamed JSON responses to GET requests under /api/
+    are touched. Routes that already set an ETag (from the result cache) keep it.
+    """
+    if (request.method != 'GET' or not request.path.startswith('/api/') or
+            response.status_code != 200 or not response.is_json or response.is_streamed):
+        return response
+
+    if 'ETag' not in response.headers:
+        response.add_etag()
+    if 'Cache-Control' not in response.headers:
+        response.headers['Cache-Control'] = API_CACHE_CONTROL
+
+    return response.make_conditional(request)
+
+def init_http_caching(app):
+    """
+    Register conditional GET handling on a Flask app.
+
+    Args:
+        app (Flask): The application
+    """
+    app.after_request(add_conditional_headers)
@@ -10,8 +10,8 @@ import os
 import sys
 import logging
 from google.ads.googleads.client import GoogleAdsClient
-from google.ads.googleads.errors import GoogleAdsException
 from pathlib import Path
+from account_metadata import get_account_metadata, fetched_at_iso
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -45,94 +45,70 @@ def get_google_ads_client():
     logger.error("Could not find google-ads.yaml in any expected location")
     return None
 
-def list_accessible_customers():
-    """Lists all accessible Google Ads customers."""
+def list_accessible_customers(refresh=False):
+    """
+    Lists all accessible Google Ads customers.
+    
+    Account details come from the shared account metadata cache, so repeated
+    runs do not re-query every customer.
+    
+    Args:
+        refresh (bool, optional): Fetch the metadata from the API even if cached.
+            Defaults to False.
+    """
     # Get the Google Ads client
     client = get_google_ads_client()
     if not client:
         logger.error("Failed to create Google Ads client")
         return
     
-    try:
-        # Get the CustomerService
-        customer_service = client.get_service("CustomerService")
-        
-        # Get accessible customers
-        accessible_customers = customer_service.list_accessible_customers()
-        
-        # Extract customer resource names
-        resource_names = accessible_customers.resource_names
-        
-        logger.info(f"Found {len(resource_names)} accessible customers")
+    metadata = get_account_metadata(client, refresh=refresh)
+    if metadata is None:
+        logger.error("Failed to get account metadata")
+        return
+    
+    accessible_customers = metadata['accessible_customers']
+    logger.info(f"Found {len(accessible_customers)} accessible customers "
+                f"(metadata fetched at {fetched_at_iso(metadata)})")
+    
+    if not accessible_customers:
+        logger.info("No accessible customers found")
+        return
+    
+    # Initialize a counter for valid accounts with detailed info
+    valid_accounts = 0
+    
+    print("\nAccessible Customer Accounts:")
+    print("=" * 80)
+    
+    for customer_id in accessible_customers:
+        customer = metadata['customers'].get(customer_id, {'id': customer_id, 'error': 'No details cached'})
         
-        # Initialize a counter for valid accounts with detailed info
-        valid_accounts = 0
+        if 'error' in customer:
+            print(f"Customer ID: {customer_id}")
+            print(f"Error accessing customer details: {customer['error']}")
+            print("-" * 80)
+            continue
         
-        if not resource_names:
-            logger.info("No accessible customers found")
-            return
+        print(f"Customer ID: {customer['id']}")
+        print(f"Name: {customer['descriptive_name']}")
+        print(f"Currency: {customer['currency_code']}")
+        print(f"Timezone: {customer['time_zone']}")
+        print(f"Manager Account: {'Yes' if customer['manager'] else 'No'}")
+        print("-" * 80)
         
-        print("\nAccessible Customer Accounts:")
+        valid_accounts += 1
+    
+    print(f"\nSuccessfully retrieved details for {valid_accounts} accounts")
+    
+    if metadata['hierarchy']:
+        print(f"\nClient accounts of manager {metadata['login_customer_id']}:")
         print("=" * 80)
-        
-        # Get the GoogleAdsService for more detailed queries
-        googleads_service = client.get_service("GoogleAdsService")
-        
-        # Process each customer resource name
-        for resource_name in resource_names:
-            # Extract customer ID from resource name (format: "customers/{customer_id}")
-            customer_id = resource_name.split('/')[1]
-            
-            # Query for more details about this customer
-            try:
-                query = """
-                SELECT
-                  customer.id,
-                  customer.descriptive_name,
-                  customer.currency_code,
-                  customer.time_zone,
-                  customer.manager
-                FROM customer
-                LIMIT 1
-                """
-                
-                # Execute the query
-                search_request = client.get_type("SearchGoogleAdsRequest")
-                search_request.customer_id = customer_id
-                search_request.query = query
-                
-                response = googleads_service.search(request=search_request)
-                
-                # Process the response
-                for row in response:
-                    customer = row.customer
-                    is_manager = customer.manager if hasattr(customer, "manager") else False
-                    
-                    print(f"Customer ID: {customer.id}")
-                    print(f"Name: {customer.descriptive_name}")
-                    print(f"Currency: {customer.currency_code}")
-                    print(f"Timezone: {customer.time_zone}")
-                    print(f"Manager Account: {'Yes' if is_manager else 'No'}")
-                    print("-" * 80)
-                    
-                    valid_accounts += 1
-                    
-            except GoogleAdsException as ex:
-                print(f"Customer ID: {customer_id}")
-                print(f"Error accessing customer details: {ex.error.message}")
-                print("-" * 80)
-        
-        print(f"\nSuccessfully retrieved details for {valid_accounts} accounts")
-        
-    except GoogleAdsException as ex:
-        logger.error(f"Google Ads API error: {ex}")
-        for error in ex.failure.errors:
-            logger.error(f"\tError with message: {error.message}")
-            if error.location:
-                for field_path_element in error.location.field_path_elements:
-                    logger.error(f"\t\tOn field: {field_path_element.field_name}")
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        for entry in metadata['hierarchy']:
+            if entry['level'] == 0:
+                continue
+            print(f"{entry['id']}  {entry['descriptive_name']}  "
+                  f"({'manager' if entry['manager'] else 'client'}, {entry['currency_code']}, {entry['time_zone']})")
 
 if __name__ == "__main__":
-    list_accessible_customers()
\ No newline at end of file
+    list_accessible_customers(refresh='--refresh' in sys.argv)
@@ -0,0 +1,138 @@
+"""
+Logging Setup for the Allervie Analytics API.
+
+Request threads hand log records to a bounded in-memory queue; a single
+QueueListener thread writes them to a size-rotated log file and the
+console. Records are rate limited per call site (logger, file, line) so
+chatty loops cannot flood the log under load, and records are dropped
+rather than blocking when the queue is full.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Log file settings
+try:
+    from config import LOG_FILE
+except ImportError:
+    LOG_FILE = 'app.log'
+
+try:
+    from config import LOG_MAX_BYTES, LOG_BACKUP_COUNT
+except ImportError:
+    LOG_MAX_BYTES = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT = 5
+
+# At most LOG_RATE_LIMIT records per call site every LOG_RATE_WINDOW seconds.
+# Warnings and errors are never rate limited.
+try:
+    from config import LOG_RATE_LIMIT, LOG_RATE_WINDOW
+except ImportError:
+    LOG_RATE_LIMIT = 20
+    LOG_RATE_WINDOW = 60
+
+# Maximum number of records waiting for the writer thread
+LOG_QUEUE_SIZE = 10000
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class CallSiteRateLimitFilter(logging.Filter):
+    """
+    Limits how many INFO/DEBUG records each call site may emit per window.
+
+    When a window closes with suppressed records, the next record let
+    through from that call site notes how many were dropped.
+    """
+
+    def __init__(self, limit=LOG_RATE_LIMIT, window=LOG_RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._sites = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        site = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window_start, count, suppressed = self._sites.get(site, (now, 0, 0))
+            if now - window_start >= self.window:
+                window_start, count = now, 0
+
+            if count >= self.limit:
+                self._sites[site] = (window_start, count, suppressed + 1)
+                return False
+
+            self._sites[site] = (window_start, count + 1, 0)
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = ()
+        return True
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener = None
+_listener_lock = threading.Lock()
+
+def configure_logging(level=logging.INFO, log_file=LOG_FILE):
+    """
+    Route all logging through the background writer thread.
+
+    Replaces any handlers already installed on the root logger (for example
+    by module-level logging.basicConfig calls). Safe to call more than once;
+    only the first call has an effect.
+
+    Args:
+        level (int, optional): Root logger level. Defaults to logging.INFO.
+        log_file (str, optional): Path of the rotating log file.
+            Defaults to LOG_FILE.
+
+    Returns:
+        QueueListener: The running listener
+    """
+    global _listener
+
+    with _listener_lock:
+        if _listener is not None:
+            return _listener
+
+        formatter = logging.Formatter(LOG_FORMAT)
+
+        file_handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+        file_handler.setFormatter(formatter)
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        queue_handler = DroppingQueueHandler(log_queue)
+        queue_handler.addFilter(CallSiteRateLimitFilter())
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+        _listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
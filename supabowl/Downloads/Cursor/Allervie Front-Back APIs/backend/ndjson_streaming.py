@@ -0,0 +1,65 @@
+"""
+Streaming NDJSON Responses.
+
+The list endpoints (/campaigns, /ad_groups, /search_terms) normally return
+one JSON array, which is serialized into a single string before the first
+byte is sent. Clients that send `Accept: application/x-ndjson` or `?stream=1`
+get newline-delimited JSON instead: one object per line, written as rows are
+produced, so neither side has to hold the whole serialized result.
+
+Streamed responses are skipped by the conditional GET hook in http_caching;
+routes pass the freshness headers of the cached result explicitly.
+"""
+
+import logging
+
+from flask import Response, current_app, request, stream_with_context
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def wants_ndjson():
+    """
+    Decide whether the current request asked for a streamed NDJSON response.
+
+    Returns:
+        bool: True for `?stream=1` (or true/yes), or an Accept header that
+            prefers application/x-ndjson over application/json
+    """
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def _encode_lines(rows):
+    dumps = current_app.json.dumps
+    count = 0
+    try:
+        for row in rows:
+            yield dumps(row) + '\n'
+            count += 1
+    except Exception as e:
+        # The status line is already sent: report the failure as the last line
+        logger.error(f"NDJSON stream failed after {count} rows: {e}")
+        yield dumps({'error': 'Stream interrupted', 'message': str(e)}) + '\n'
+        return
+    logger.info(f"Streamed {count} rows as NDJSON")
+
+def ndjson_response(rows, headers=None):
+    """
+    Build a streamed NDJSON response.
+
+    Args:
+        rows (iterable): Dicts to write, one per line. Generators are consumed
+            lazily, inside the request context.
+        headers (dict, optional): Extra response headers (e.g. freshness headers)
+
+    Returns:
+        Response: A 200 application/x-ndjson response
+    """
+    response = Response(stream_with_context(_encode_lines(rows)), mimetype=NDJSON_MIMETYPE, headers=headers)
+    # Ask proxies such as nginx not to buffer the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,217 @@
+"""
+Keyset Pagination for the List Endpoints.
+
+/campaigns, /ad_groups and /search_terms accept `limit`, `cursor` and
+`sort` (a field name, prefixed with '-' for descending order). Without any
+of them the endpoints keep returning the full JSON array.
+
+Pages are cut from the cached result of the fetch function. For each
+(cached result, sort field, direction) a sorted index is built once and
+kept in a small LRU, so following pages only cost a binary search and a
+slice. Cursors hold the sort key and position of the last row served
+(keyset pagination), so a page continues after that row even if the
+cached result was refreshed in between.
+"""
+
+import base64
+import binascii
+import json
+import logging
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+
+from result_cache import peek_freshness
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Page size when `limit` is not given, and the largest page allowed
+try:
+    from config import PAGINATION_DEFAULT_LIMIT
+except ImportError:
+    PAGINATION_DEFAULT_LIMIT = 100
+
+try:
+    from config import PAGINATION_MAX_LIMIT
+except ImportError:
+    PAGINATION_MAX_LIMIT = 1000
+
+# Sorted indexes kept in memory (one per cached result, sort field and direction)
+try:
+    from config import PAGINATION_MAX_INDEXES
+except ImportError:
+    PAGINATION_MAX_INDEXES = 64
+
+PAGE_PARAMS = ('limit', 'cursor', 'sort')
+
+# Fields each endpoint can be sorted by
+SORT_FIELDS = {
+    'campaigns': ('name', 'status', 'impressions', 'clicks', 'cost', 'ctr'),
+    'ad_groups': ('name', 'campaign_name', 'status', 'impressions', 'clicks', 'cost', 'ctr'),
+    'search_terms': ('search_term', 'campaign_name', 'ad_group_name', 'impressions', 'clicks', 'cost', 'ctr'),
+}
+
+# Sort when only `limit` or `cursor` is given: the order of the full array
+DEFAULT_SORT = {
+    'campaigns': 'name',
+    'ad_groups': 'campaign_name',
+    'search_terms': '-impressions',
+}
+
+class PaginationError(ValueError):
+    """Raised for invalid limit, cursor or sort parameters."""
+
+class _Descending:
+    """Wraps a sort value so it orders in reverse."""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+def _sort_key(value, position, descending):
+    # Missing values ("N/A" or None) sort last in both directions; the row's
+    # position in the cached result breaks ties, so every key is unique.
+    missing = value is None or value == "N/A"
+    value = 0 if missing else value
+    return (missing, _Descending(value) if descending else value, position)
+
+class PageRequest:
+    """Validated pagination parameters of one request."""
+    __slots__ = ('endpoint', 'sort', 'field', 'descending', 'limit', 'after')
+
+    def __init__(self, endpoint, sort, limit, after):
+        self.endpoint = endpoint
+        self.sort = sort
+        self.field = sort.lstrip('-')
+        self.descending = sort.startswith('-')
+        self.limit = limit
+        self.after = after
+
+def _encode_cursor(sort, row, position, field):
+    payload = json.dumps({'s': sort, 'v': row.get(field), 'p': position}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return payload['s'], payload['v'], int(payload['p'])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise PaginationError("Malformed cursor")
+
+def parse_page_request(endpoint, args):
+    """
+    Read and validate the pagination parameters of a request.
+
+    Args:
+        endpoint (str): 'campaigns', 'ad_groups' or 'search_terms'
+        args (MultiDict): The request's query parameters
+
+    Returns:
+        PageRequest: The parameters, or None if the request did not ask for a page
+
+    Raises:
+        PaginationError: If a parameter is invalid
+    """
+    if not any(name in args for name in PAGE_PARAMS):
+        return None
+
+    cursor = args.get('cursor')
+    after = _decode_cursor(cursor) if cursor else None
+
+    sort = args.get('sort') or (after[0] if after else DEFAULT_SORT[endpoint])
+    if sort.lstrip('-') not in SORT_FIELDS[endpoint]:
+        raise PaginationError(f"Cannot sort {endpoint} by '{sort}'. "
+                              f"Sortable fields: {', '.join(SORT_FIELDS[endpoint])}")
+    if after and after[0] != sort:
+        raise PaginationError(f"Cursor was issued for sort '{after[0]}', not '{sort}'")
+
+    try:
+        limit = int(args.get('limit', PAGINATION_DEFAULT_LIMIT))
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if not 1 <= limit <= PAGINATION_MAX_LIMIT:
+        raise PaginationError(f"limit must be between 1 and {PAGINATION_MAX_LIMIT}")
+
+    return PageRequest(endpoint, sort, limit, after)
+
+class _SortedIndex:
+    """Row positions of a result in sort order, with their sort keys for binary search."""
+    __slots__ = ('keys', 'positions')
+
+    def __init__(self, rows, field, descending):
+        keyed = sorted((_sort_key(row.get(field), position, descending), position)
+                       for position, row in enumerate(rows))
+        self.keys = [key for key, _ in keyed]
+        self.positions = [position for _, position in keyed]
+
+_indexes_lock = threading.Lock()
+_indexes = OrderedDict()
+
+def _get_index(page_request, rows):
+    """Get the sorted index of the current cached result, building it on first use."""
+    freshness = peek_freshness()
+    if freshness is None:
+        # Not served from the result cache: nothing stable to key the index on
+        return _SortedIndex(rows, page_request.field, page_request.descending)
+
+    key = (page_request.endpoint, freshness['etag'], page_request.field, page_request.descending)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+
+    index = _SortedIndex(rows, page_request.field, page_request.descending)
+    logger.debug(f"Built {page_request.sort} index for {len(rows)} {page_request.endpoint}")
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > PAGINATION_MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+def paginate(rows, page_request):
+    """
+    Cut one page from a result.
+
+    Args:
+        rows (list): The full result, as returned by the fetch function
+        page_request (PageRequest): See parse_page_request
+
+    Returns:
+        dict: items, nextCursor (None on the last page), total, sort and limit
+
+    Raises:
+        PaginationError: If the cursor's value cannot be compared with the sort field
+    """
+    index = _get_index(page_request, rows)
+
+    start = 0
+    if page_request.after:
+        _, value, position = page_request.after
+        try:
+            start = bisect_right(index.keys, _sort_key(value, position, page_request.descending))
+        except TypeError:
+            raise PaginationError("Cursor does not match the sort field")
+
+    positions = index.positions[start:start + page_request.limit]
+    next_cursor = None
+    if start + page_request.limit < len(index.positions) and positions:
+        last = positions[-1]
+        next_cursor = _encode_cursor(page_request.sort, rows[last], last, page_request.field)
+
+    return {
+        'items': [rows[position] for position in positions],
+        'nextCursor': next_cursor,
+        'total': len(rows),
+        'sort': page_request.sort,
+        'limit': page_request.limit
+    }
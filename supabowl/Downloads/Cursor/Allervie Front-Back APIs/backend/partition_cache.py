@@ -0,0 +1,271 @@
+"""
+Per-Day Partition Cache for Google Ads Metrics.
+
+Fetched rows are stored as one partition per (customer, entity level, date).
+A partition synced after its day left the conversion-lag window is final and
+is never fetched again. Partitions synced while their day was still inside
+the window ("hot" days) are re-synced once older than PARTITION_HOT_TTL, and
+in any case once the window has closed, so late conversions are not lost. A request for a long date range
+therefore only queries the API for the missing or hot days and merges them
+with the cached partitions.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Days (counting back from today) whose metrics can still change through conversion lag
+try:
+    from config import PARTITION_HOT_DAYS
+except ImportError:
+    PARTITION_HOT_DAYS = 3
+
+# Seconds before a hot day's partition is re-synced from the API
+try:
+    from config import PARTITION_HOT_TTL
+except ImportError:
+    PARTITION_HOT_TTL = 900
+
+# Maximum number of partitions kept; least recently used partitions are evicted
+try:
+    from config import PARTITION_CACHE_MAX_PARTITIONS
+except ImportError:
+    PARTITION_CACHE_MAX_PARTITIONS = 20000
+
+# Additive counters stored for every daily row
+COUNTER_FIELDS = ('impressions', 'clicks', 'conversions', 'cost_micros')
+
+def to_date(value):
+    """Convert a YYYY-MM-DD string (or date/datetime) to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def days_between(start_date, end_date):
+    """List every date from start_date to end_date inclusive."""
+    start, end = to_date(start_date), to_date(end_date)
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+def contiguous_ranges(days):
+    """Group sorted dates into contiguous (start, end) ranges."""
+    ranges = []
+    for day in days:
+        if ranges and day == ranges[-1][1] + timedelta(days=1):
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return [(start, end) for start, end in ranges]
+
+class DailyStore:
+    """
+    Base class for stores of daily Google Ads rows.
+
+    Rows are plain dicts with a 'date' key (YYYY-MM-DD), an 'entity_id'
+    (customer, campaign or ad group ID depending on the level), the entity's
+    identity fields and the additive counters in COUNTER_FIELDS.
+
+    Subclasses implement synced_times, store, rows, purge and stats.
+    """
+
+    def __init__(self, hot_days=PARTITION_HOT_DAYS, hot_ttl=PARTITION_HOT_TTL):
+        self.hot_days = hot_days
+        self.hot_ttl = hot_ttl
+        self._stats_lock = threading.Lock()
+        self._sync_stats = {'cached_days': 0, 'fetched_days': 0, 'api_queries': 0}
+        # Incremented whenever sync stores fetched days, so derived views can detect changes
+        self.version = 0
+
+    def is_hot(self, day):
+        """Return True if day is still inside the conversion-lag window."""
+        return day >= date.today() - timedelta(days=self.hot_days)
+
+    def final_at(self, day):
+        """Get the epoch time (local midnight) after which day's metrics no longer change."""
+        return time.mktime((day + timedelta(days=self.hot_days + 1)).timetuple())
+
+    def is_final(self, day, synced_at):
+        """Return True if a partition of day synced at synced_at holds the day's final metrics."""
+        return synced_at >= self.final_at(day)
+
+    def synced_times(self, customer_id, level, start_date, end_date):
+        """
+        Get when each stored day in a range was last synced.
+
+        Returns:
+            dict: date -> (sync timestamp in seconds since the epoch, whether the
+                partition was synced after the day's conversion-lag window closed)
+        """
+        raise NotImplementedError
+
+    def missing_ranges(self, customer_id, level, start_date, end_date):
+        """
+        Find the days that must be fetched from the API.
+
+        Args:
+            customer_id (str): Google Ads customer ID
+            level (str): Entity level, e.g. 'customer', 'campaign' or 'ad_group'
+            start_date (str): Start date in YYYY-MM-DD format
+            end_date (str): End date in YYYY-MM-DD format
+
+        Returns:
+            list: Contiguous (start, end) date ranges that are missing, or were
+                synced while hot and are either stale or no longer hot
+        """
+        synced = self.synced_times(customer_id, level, start_date, end_date)
+        now = time.time()
+        missing = []
+        for day in days_between(start_date, end_date):
+            if day not in synced:
+                missing.append(day)
+                continue
+            synced_at, final = synced[day]
+            # A partition synced while hot is partial: refresh it while hot, and once more after the window closes
+            if not final and (not self.is_hot(day) or now - synced_at >= self.hot_ttl):
+                missing.append(day)
+        return contiguous_ranges(missing)
+
+    def sync(self, customer_id, level, start_date, end_date, fetch_range):
+        """
+        Fetch the missing or hot days of a date range from the API and store them.
+
+        Args:
+            customer_id (str): Google Ads customer ID
+            level (str): Entity level
+            start_date (str): Start date in YYYY-MM-DD format
+            end_date (str): End date in YYYY-MM-DD format
+            fetch_range (callable): Called as fetch_range(start, end) with
+                YYYY-MM-DD strings; returns an iterable of row dicts for that range.
+                Exceptions propagate to the caller and nothing is stored.
+        """
+        ranges = self.missing_ranges(customer_id, level, start_date, end_date)
+        total_days = len(days_between(start_date, end_date))
+        fetched_days = sum((end - start).days + 1 for start, end in ranges)
+
+        for range_start, range_end in ranges:
+            range_rows = list(fetch_range(range_start.isoformat(), range_end.isoformat()))
+            self.store(customer_id, level, range_start, range_end, range_rows)
+
+        with self._stats_lock:
+            if ranges:
+                self.version += 1
+            self._sync_stats['api_queries'] += len(ranges)
+            self._sync_stats['fetched_days'] += fetched_days
+            self._sync_stats['cached_days'] += max(total_days - fetched_days, 0)
+
+        logger.info(f"{level} days {start_date} to {end_date}: {total_days - fetched_days} stored, "
+                    f"{fetched_days} fetched in {len(ranges)} query(ies)")
+
+    def store(self, customer_id, level, start_date, end_date, rows):
+        """
+        Replace the stored rows of a date range.
+
+        Days in the range without rows are recorded as synced and empty so
+        they are not fetched again.
+        """
+        raise NotImplementedError
+
+    def rows(self, customer_id, level, start_date, end_date):
+        """Get the stored daily rows of a date range, oldest day first."""
+        raise NotImplementedError
+
+class DailyPartitionCache(DailyStore):
+    """Keeps daily rows in memory as one partition per (customer, level, date)."""
+
+    def __init__(self, hot_days=PARTITION_HOT_DAYS, hot_ttl=PARTITION_HOT_TTL,
+                 max_partitions=PARTITION_CACHE_MAX_PARTITIONS):
+        super().__init__(hot_days, hot_ttl)
+        self.max_partitions = max_partitions
+        self._lock = threading.Lock()
+        self._partitions = OrderedDict()
+        self._evictions = 0
+
+    def synced_times(self, customer_id, level, start_date, end_date):
+        with self._lock:
+            synced = {}
+            for day in days_between(start_date, end_date):
+                partition = self._partitions.get((customer_id, level, day))
+                if partition is not None:
+                    synced[day] = (partition[1], partition[2])
+            return synced
+
+    def store(self, customer_id, level, start_date, end_date, rows):
+        rows_by_date = {day: [] for day in days_between(start_date, end_date)}
+        for row in rows:
+            rows_by_date.setdefault(to_date(row['date']), []).append(row)
+
+        synced_at = time.time()
+        with self._lock:
+            for day, day_rows in rows_by_date.items():
+                key = (customer_id, level, day)
+                self._partitions.pop(key, None)
+                self._partitions[key] = (day_rows, synced_at, self.is_final(day, synced_at))
+
+            while len(self._partitions) > self.max_partitions:
+                self._partitions.popitem(last=False)
+                self._evictions += 1
+
+    def rows(self, customer_id, level, start_date, end_date):
+        result = []
+        with self._lock:
+            for day in days_between(start_date, end_date):
+                key = (customer_id, level, day)
+                partition = self._partitions.get(key)
+                if partition is not None:
+                    self._partitions.move_to_end(key)
+                    result.extend(partition[0])
+        return result
+
+    def purge(self, customer_id=None, level=None):
+        """
+        Remove partitions.
+
+        Args:
+            customer_id (str, optional): Only purge this customer's partitions
+            level (str, optional): Only purge this entity level's partitions
+
+        Returns:
+            int: Number of partitions removed
+        """
+        with self._lock:
+            keys = [key for key in self._partitions
+                    if (customer_id is None or key[0] == customer_id) and (level is None or key[1] == level)]
+            for key in keys:
+                del self._partitions[key]
+        logger.info(f"Purged {len(keys)} partition(s)")
+        return len(keys)
+
+    def stats(self):
+        """
+        Get partition cache statistics.
+
+        Returns:
+            dict: Partition count per level plus cached/fetched day and query counters
+        """
+        with self._lock:
+            levels = {}
+            for key in self._partitions:
+                levels[key[1]] = levels.get(key[1], 0) + 1
+            partitions = len(self._partitions)
+            evictions = self._evictions
+        with self._stats_lock:
+            sync_stats = dict(self._sync_stats)
+        return {
+            'store': 'memory',
+            'partitions': partitions,
+            'levels': levels,
+            'hot_days': self.hot_days,
+            'hot_ttl': self.hot_ttl,
+            'evictions': evictions,
+            **sync_stats
+        }
+
+# Process-wide partition cache shared by all fetch functions
+partition_cache = DailyPartitionCache()
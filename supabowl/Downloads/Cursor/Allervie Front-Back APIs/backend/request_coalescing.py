@@ -0,0 +1,160 @@
+"""
+Single-Flight Request Coalescing.
+
+When several requests ask for the same Google Ads data at the same time,
+only the first one (the leader) runs the fetch. The others (followers)
+wait for it to finish and share its result.
+"""
+
+import functools
+import inspect
+import logging
+import threading
+from datetime import date
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class _InFlightCall:
+    """A fetch that is currently running, shared by its leader and followers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    Results are not cached: once the leader finishes, the next call with the
+    same key starts a new fetch.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {}
+
+    def do(self, key, fn):
+        """
+        Run fn for key, or wait for the identical call already in flight.
+
+        Args:
+            key (tuple): Identity of the call; key[0] is the endpoint name
+            fn (callable): Zero-argument function performing the fetch
+
+        Returns:
+            The result of fn, shared with every concurrent caller
+        """
+        with self._lock:
+            stats = self._stats.setdefault(key[0], {'leaders': 0, 'followers': 0})
+            call = self._calls.get(key)
+            if call is None:
+                call = _InFlightCall()
+                self._calls[key] = call
+                stats['leaders'] += 1
+                is_leader = True
+            else:
+                stats['followers'] += 1
+                is_leader = False
+
+        if not is_leader:
+            logger.info(f"Joining in-flight {key[0]} fetch")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """
+        Get leader and follower counts per endpoint.
+
+        Returns:
+            dict: Endpoint name -> {'leaders': int, 'followers': int, 'in_flight': int}
+        """
+        with self._lock:
+            result = {endpoint: dict(counts) for endpoint, counts in self._stats.items()}
+            for key in self._calls:
+                result[key[0]]['in_flight'] = result[key[0]].get('in_flight', 0) + 1
+            return result
+
+# Process-wide single-flight group shared by all fetch functions
+single_flight = SingleFlight()
+
+def _get_customer_id():
+    """Return the configured client customer ID, if any."""
+    try:
+        from config import CLIENT_CUSTOMER_ID
+        return CLIENT_CUSTOMER_ID
+    except ImportError:
+        return None
+
+def fetch_key(endpoint, signature, args, kwargs, ignore=('client',)):
+    """
+    Build the identity of a fetch call.
+
+    The GAQL each fetch function runs is fully determined by its arguments,
+    so (endpoint, customer ID, bound arguments) identifies the normalized
+    query and date range. Today's date is included because omitted dates
+    default to windows relative to today.
+
+    Args:
+        endpoint (str): Name of the fetch function
+        signature (inspect.Signature): Signature of the fetch function
+        args (tuple): Positional arguments of the call
+        kwargs (dict): Keyword arguments of the call
+        ignore (tuple, optional): Argument names that do not affect the result,
+            such as the API client. Defaults to ('client',).
+
+    Returns:
+        tuple: Hashable key for the call
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = tuple(
+        (name, value) for name, value in sorted(bound.arguments.items())
+        if name not in ignore
+    )
+    return (endpoint, _get_customer_id(), params, date.today().isoformat())
+
+def coalesced(endpoint, ignore=('client',)):
+    """
+    Decorator that routes a fetch function through the shared single-flight group.
+
+    Args:
+        endpoint (str): Name used in keys and statistics
+        ignore (tuple, optional): Argument names excluded from the key.
+            Defaults to ('client',).
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = fetch_key(endpoint, signature, args, kwargs, ignore)
+            return single_flight.do(key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+    return decorator
+
+def get_coalescing_stats():
+    """
+    Get single-flight leader and follower counts per endpoint.
+
+    Returns:
+        dict: Endpoint name -> counters
+    """
+    return single_flight.stats()
@@ -0,0 +1,377 @@
+"""
+Result Cache for Google Ads Fetch Functions.
+
+Successful results of the Google Ads fetch functions are cached with a
+per-endpoint TTL in the shared cache backend (see cache_backends), which
+enforces a total byte budget with least-recently-used eviction. With the
+SQLite backend, every worker process shares the cache and it stays warm
+across restarts. Keys are built the same way as single-flight keys:
+customer, the arguments that determine the GAQL query, and the date range.
+
+Entries past their TTL (soft expiry) but within the endpoint's hard TTL are
+still served immediately while a background refresh replaces them
+(stale-while-revalidate); only past the hard TTL does a caller wait for the
+API. Each entry carries a content hash (etag) so routes can answer
+conditional requests without running the fetch; see http_caching.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from request_coalescing import fetch_key
+from cache_backends import get_cache_backend
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Seconds each endpoint's results stay fresh
+try:
+    from config import RESULT_CACHE_TTLS
+except ImportError:
+    RESULT_CACHE_TTLS = {
+        'ads_performance': 300,
+        'campaign_performance': 600,
+        'ad_group_performance': 600,
+        'search_term_performance': 900
+    }
+
+DEFAULT_TTL = 300
+
+# Seconds after which a stale entry is no longer served and callers block on a
+# fresh fetch. Endpoints not listed here are not served stale.
+try:
+    from config import RESULT_CACHE_HARD_TTLS
+except ImportError:
+    RESULT_CACHE_HARD_TTLS = {
+        'ads_performance': 3600,
+        'campaign_performance': 3600,
+        'ad_group_performance': 3600
+    }
+
+# Threads refreshing stale entries in the background
+try:
+    from config import RESULT_CACHE_REFRESH_WORKERS
+except ImportError:
+    RESULT_CACHE_REFRESH_WORKERS = 2
+
+# Backend namespaces are prefixed so results can be purged without touching other caches
+NAMESPACE_PREFIX = 'result:'
+
+# Lookup results
+FRESH = 'fresh'
+STALE = 'stale'
+MISS = 'miss'
+
+class _CacheEntry:
+    """A cached result as stored in the backend: value, etag and timestamps."""
+    __slots__ = ('value', 'etag', 'created_at', 'expires_at')
+
+    def __init__(self, record):
+        self.value = record['value']
+        self.etag = record['etag']
+        self.created_at = record['created_at']
+        self.expires_at = record['expires_at']
+
+class ResultCache:
+    """
+    TTL cache with stale-while-revalidate on top of a CacheBackend.
+
+    Keys are tuples whose first element is the endpoint name, which is
+    used for per-endpoint TTLs, statistics and purging. Hit and miss
+    statistics are counted per process.
+    """
+
+    def __init__(self, backend=None, ttls=None, hard_ttls=None):
+        self._backend = backend
+        self.ttls = dict(RESULT_CACHE_TTLS if ttls is None else ttls)
+        self.hard_ttls = dict(RESULT_CACHE_HARD_TTLS if hard_ttls is None else hard_ttls)
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._refreshing = set()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=RESULT_CACHE_REFRESH_WORKERS,
+                                                thread_name_prefix='cache-refresh')
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = get_cache_backend()
+        return self._backend
+
+    def _endpoint_stats(self, endpoint):
+        return self._stats.setdefault(endpoint, {
+            'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_failures': 0
+        })
+
+    @staticmethod
+    def _backend_key(key):
+        return NAMESPACE_PREFIX + key[0], json.dumps(key[1:], default=str)
+
+    def _load(self, key):
+        record = self.backend.get(*self._backend_key(key))
+        return _CacheEntry(record) if record is not None else None
+
+    def get(self, key):
+        """
+        Look up a cached result.
+
+        Args:
+            key (tuple): Cache key
+
+        Returns:
+            tuple: (FRESH, entry) within the TTL, (STALE, entry) past the TTL but
+                within the hard TTL, (MISS, None) otherwise
+        """
+        entry = self._load(key)
+        with self._lock:
+            stats = self._endpoint_stats(key[0])
+            if entry is None:
+                stats['misses'] += 1
+                return MISS, None
+
+            if entry.expires_at <= time.time():
+                stats['stale_hits'] += 1
+                return STALE, entry
+
+            stats['hits'] += 1
+            return FRESH, entry
+
+    def set(self, key, value):
+        """
+        Store a result; the backend evicts least recently used entries if over budget.
+
+        Args:
+            key (tuple): Cache key
+            value: JSON-serializable result
+
+        Returns:
+            _CacheEntry: The stored entry
+        """
+        serialized = json.dumps(value, default=str, sort_keys=True).encode('utf-8')
+        ttl = self.ttls.get(key[0], DEFAULT_TTL)
+        hard_ttl = max(ttl, self.hard_ttls.get(key[0], ttl))
+        created_at = time.time()
+        record = {
+            'value': value,
+            'etag': hashlib.sha1(serialized).hexdigest(),
+            'created_at': created_at,
+            'expires_at': created_at + ttl
+        }
+        namespace, backend_key = self._backend_key(key)
+        self.backend.set(namespace, backend_key, record, hard_ttl, size=len(serialized))
+        return _CacheEntry(record)
+
+    def peek(self, key):
+        """
+        Get a fresh entry without recording a hit or miss.
+
+        Args:
+            key (tuple): Cache key
+
+        Returns:
+            _CacheEntry: The entry if it is within its TTL, otherwise None
+        """
+        entry = self._load(key)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        return entry
+
+    def refresh_in_background(self, key, fn):
+        """
+        Re-run a fetch for a stale entry without blocking the caller.
+
+        At most one refresh per key runs at a time in this process. A failed
+        refresh (None or an exception) leaves the stale entry in place until
+        its hard TTL.
+
+        Args:
+            key (tuple): Cache key of the stale entry
+            fn (callable): Zero-argument function performing the fetch
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = fn()
+                with self._lock:
+                    stats = self._endpoint_stats(key[0])
+                    if value is None:
+                        stats['refresh_failures'] += 1
+                    else:
+                        stats['refreshes'] += 1
+                if value is not None:
+                    self.set(key, value)
+            except Exception as e:
+                logger.error(f"Background refresh of {key[0]} failed: {e}")
+                with self._lock:
+                    self._endpoint_stats(key[0])['refresh_failures'] += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_pool.submit(refresh)
+
+    def purge(self, endpoint=None):
+        """
+        Remove cached results.
+
+        Args:
+            endpoint (str, optional): Only purge this endpoint's results.
+                Defaults to None (purge everything).
+
+        Returns:
+            int: Number of entries removed
+        """
+        if endpoint is not None:
+            purged = self.backend.purge(NAMESPACE_PREFIX + endpoint)
+        else:
+            purged = sum(self.backend.purge(namespace) for namespace in self.backend.stats()['namespaces']
+                         if namespace.startswith(NAMESPACE_PREFIX))
+        logger.info(f"Purged {purged} cached result(s) for {endpoint or 'all endpoints'}")
+        return purged
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Backend totals plus hits, stale hits, misses and refreshes per endpoint
+        """
+        backend_stats = self.backend.stats()
+        with self._lock:
+            return {
+                'backend': backend_stats,
+                'ttls': dict(self.ttls),
+                'hard_ttls': dict(self.hard_ttls),
+                'refreshing': len(self._refreshing),
+                'endpoints': {endpoint: dict(counts) for endpoint, counts in self._stats.items()}
+            }
+
+# Process-wide cache shared by all fetch functions
+result_cache = ResultCache()
+
+# Freshness of the last cached result served on the current thread
+_freshness = threading.local()
+
+def _record_freshness(entry, stale):
+    _freshness.value = (entry, stale) if entry is not None else None
+
+def describe_entry(entry, stale=False):
+    """
+    Describe the freshness of a cache entry.
+
+    Returns:
+        dict: {'as_of': ISO 8601 UTC timestamp of the fetch, 'stale': bool,
+            'etag': content hash of the cached result}
+    """
+    return {
+        'as_of': datetime.fromtimestamp(entry.created_at, timezone.utc).isoformat(),
+        'stale': stale,
+        'etag': entry.etag
+    }
+
+def pop_freshness():
+    """
+    Get and clear the freshness of the last cached result served on this thread.
+
+    Returns:
+        dict: See describe_entry, or None if no cached result was served
+    """
+    value = getattr(_freshness, 'value', None)
+    _freshness.value = None
+    if value is None:
+        return None
+    return describe_entry(*value)
+
+def peek_freshness():
+    """
+    Get the freshness of the last cached result served on this thread without clearing it.
+
+    Returns:
+        dict: See describe_entry, or None if no cached result was served
+    """
+    value = getattr(_freshness, 'value', None)
+    if value is None:
+        return None
+    return describe_entry(*value)
+
+def cached(endpoint, ignore=('client',)):
+    """
+    Decorator that serves a fetch function's results from the shared cache.
+
+    Stale results within the hard TTL are returned immediately and refreshed
+    in the background. Failed fetches (None results) are not cached.
+
+    Args:
+        endpoint (str): Name used in keys, TTLs and statistics
+        ignore (tuple, optional): Argument names excluded from the key.
+            Defaults to ('client',).
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            _record_freshness(None, False)
+            key = fetch_key(endpoint, signature, args, kwargs, ignore)
+            status, entry = result_cache.get(key)
+            if status == FRESH:
+                _record_freshness(entry, False)
+                return entry.value
+
+            if status == STALE:
+                logger.info(f"Serving stale {endpoint} result while refreshing in the background")
+                result_cache.refresh_in_background(key, lambda: fn(*args, **kwargs))
+                _record_freshness(entry, True)
+                return entry.value
+
+            value = fn(*args, **kwargs)
+            if value is not None:
+                entry = result_cache.set(key, value)
+                _record_freshness(entry, False)
+            return value
+
+        def peek(*args, **kwargs):
+            """Get the fresh cache entry for these arguments without fetching."""
+            return result_cache.peek(fetch_key(endpoint, signature, args, kwargs, ignore))
+
+        def prime(value, *args, **kwargs):
+            """Cache a result produced outside the fetch function (e.g. while streaming it)."""
+            return result_cache.set(fetch_key(endpoint, signature, args, kwargs, ignore), value)
+
+        wrapper.peek = peek
+        wrapper.prime = prime
+        return wrapper
+    return decorator
+
+def purge_results(endpoint=None):
+    """
+    Purge cached Google Ads results.
+
+    Args:
+        endpoint (str, optional): Only purge this endpoint's results.
+            Defaults to None (purge everything).
+
+    Returns:
+        int: Number of entries removed
+    """
+    return result_cache.purge(endpoint)
+
+def get_cache_stats():
+    """
+    Get statistics for the shared result cache.
+
+    Returns:
+        dict: Cache statistics
+    """
+    return result_cache.stats()
@@ -0,0 +1,338 @@
+"""
+Campaign and Ad Group x Day Rollup Cube.
+
+The dashboard's three views (account totals, campaigns, ad groups) are sums
+of daily rows. Two date-segmented queries fill the daily store, one per
+level, and their rows are materialized into an in-memory cube with
+pre-computed roll-ups:
+
+- ad_group: (date, ad group) cells, from the ad group x day rows
+- campaign: (date, campaign) cells, from the campaign x day rows
+- customer: one cell per date, summed from the campaign cells
+
+Campaign and account totals come from the campaign rows, not from the ad
+group cells: campaigns without ad groups (e.g. Performance Max) have no ad
+group rows but still spend. Any date window inside the cube is answered by
+summing its cells.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from partition_cache import COUNTER_FIELDS, to_date
+from fact_store import get_daily_store
+from gaql_executor import execute_query, run_concurrently
+from request_coalescing import single_flight
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Seconds a built cube is reused before it is rebuilt from the daily store
+# (other worker processes may have re-synced hot days in the meantime)
+try:
+    from config import ROLLUP_CUBE_TTL
+except ImportError:
+    ROLLUP_CUBE_TTL = 300
+
+# Maximum number of cubes (customer and date window) kept in memory
+try:
+    from config import ROLLUP_CUBE_MAX_CUBES
+except ImportError:
+    ROLLUP_CUBE_MAX_CUBES = 16
+
+LEVELS = ('ad_group', 'campaign', 'customer')
+
+# Levels synced into the daily store for each cube
+SYNCED_LEVELS = ('campaign', 'ad_group')
+
+def _status_name(resource):
+    """Return the status enum name of a resource, or "N/A" if it has none."""
+    if hasattr(resource, 'status') and resource.status is not None:
+        return resource.status.name
+    return "N/A"
+
+def _ad_group_row(row):
+    """Convert an ad group API row (segmented by date) into a stored daily row."""
+    campaign = row.campaign
+    ad_group = row.ad_group
+    return {
+        'entity_id': str(ad_group.id),
+        'date': row.segments.date,
+        'campaign_id': str(campaign.id),
+        'campaign_name': campaign.name if hasattr(campaign, 'name') else "Unnamed Campaign",
+        'campaign_status': _status_name(campaign),
+        'ad_group_id': str(ad_group.id),
+        'ad_group_name': ad_group.name if hasattr(ad_group, 'name') else "Unnamed Ad Group",
+        'status': _status_name(ad_group),
+        'impressions': row.metrics.impressions,
+        'clicks': row.metrics.clicks,
+        'conversions': row.metrics.conversions,
+        'cost_micros': row.metrics.cost_micros,
+    }
+
+def _campaign_row(row):
+    """Convert a campaign API row (segmented by date) into a stored daily row."""
+    campaign = row.campaign
+    return {
+        'entity_id': str(campaign.id),
+        'date': row.segments.date,
+        'campaign_id': str(campaign.id),
+        'campaign_name': campaign.name if hasattr(campaign, 'name') else "Unnamed Campaign",
+        'campaign_status': _status_name(campaign),
+        'status': _status_name(campaign),
+        'impressions': row.metrics.impressions,
+        'clicks': row.metrics.clicks,
+        'conversions': row.metrics.conversions,
+        'cost_micros': row.metrics.cost_micros,
+    }
+
+def fetch_campaign_days(client, customer_id, range_start, range_end):
+    """
+    Query the campaign x date rows of a date range.
+
+    Args:
+        client (GoogleAdsClient): Google Ads API client
+        customer_id (str): Google Ads customer ID
+        range_start (str): Start date in YYYY-MM-DD format
+        range_end (str): End date in YYYY-MM-DD format
+
+    Yields:
+        dict: Daily campaign rows in the daily store format
+    """
+    query = f"""
+        SELECT
+            segments.date,
+            campaign.id,
+            campaign.name,
+            campaign.status,
+            metrics.impressions,
+            metrics.clicks,
+            metrics.conversions,
+            metrics.cost_micros
+        FROM campaign
+        WHERE segments.date BETWEEN '{range_start}' AND '{range_end}'
+    """
+    logger.info(f"Executing Google Ads API query for campaign days from {range_start} to {range_end}")
+    for row in execute_query(client, customer_id, query, label='rollup_cube_campaigns'):
+        yield _campaign_row(row)
+
+def fetch_ad_group_days(client, customer_id, range_start, range_end):
+    """
+    Query the ad group x date rows of a date range.
+
+    Args:
+        client (GoogleAdsClient): Google Ads API client
+        customer_id (str): Google Ads customer ID
+        range_start (str): Start date in YYYY-MM-DD format
+        range_end (str): End date in YYYY-MM-DD format
+
+    Yields:
+        dict: Daily ad group rows in the daily store format
+    """
+    query = f"""
+        SELECT
+            segments.date,
+            campaign.id,
+            campaign.name,
+            campaign.status,
+            ad_group.id,
+            ad_group.name,
+            ad_group.status,
+            metrics.impressions,
+            metrics.clicks,
+            metrics.conversions,
+            metrics.cost_micros
+        FROM ad_group
+        WHERE segments.date BETWEEN '{range_start}' AND '{range_end}'
+    """
+    logger.info(f"Executing Google Ads API query for ad group days from {range_start} to {range_end}")
+    for row in execute_query(client, customer_id, query, label='rollup_cube'):
+        yield _ad_group_row(row)
+
+class RollupCube:
+    """
+    Counters of one customer's campaigns and ad groups per day, with account totals.
+
+    Cells are dicts of COUNTER_FIELDS keyed by (YYYY-MM-DD date, entity ID)
+    per level. Identity fields (names and statuses) come from each entity's
+    most recent day.
+    """
+
+    def __init__(self, customer_id, start_date, end_date, campaign_rows, ad_group_rows, version=None):
+        self.customer_id = str(customer_id)
+        self.start_date = to_date(start_date).isoformat()
+        self.end_date = to_date(end_date).isoformat()
+        self.version = version
+        self.built_at = time.time()
+        self._cells = {level: {} for level in LEVELS}
+        self._identity = {level: {} for level in LEVELS}
+        self._identity['customer'][self.customer_id] = {}
+
+        # Rows are oldest day first, so later rows overwrite identities with current names
+        for row in campaign_rows:
+            self._identity['campaign'][row['entity_id']] = {
+                'campaign_id': row['campaign_id'],
+                'campaign_name': row['campaign_name'],
+                # Campaign rows stored before campaign_status existed carry it in status
+                'status': row.get('campaign_status') or row.get('status') or "N/A",
+            }
+            self._add(row, (('campaign', row['entity_id']), ('customer', self.customer_id)))
+        for row in ad_group_rows:
+            self._identity['ad_group'][row['entity_id']] = {
+                'campaign_id': row['campaign_id'],
+                'campaign_name': row['campaign_name'],
+                'ad_group_id': row['ad_group_id'],
+                'ad_group_name': row['ad_group_name'],
+                'status': row['status'],
+            }
+            self._add(row, (('ad_group', row['entity_id']),))
+
+    def _add(self, row, cells):
+        """Add a daily row's counters to the (level, entity ID) cells of its date."""
+        for level, entity_id in cells:
+            cell = self._cells[level].get((row['date'], entity_id))
+            if cell is None:
+                cell = self._cells[level][(row['date'], entity_id)] = dict.fromkeys(COUNTER_FIELDS, 0)
+            for field in COUNTER_FIELDS:
+                cell[field] += row[field]
+
+    def covers(self, start_date, end_date):
+        """Return True if the cube holds every day of a date range."""
+        return self.start_date <= to_date(start_date).isoformat() and to_date(end_date).isoformat() <= self.end_date
+
+    def rollup(self, level, start_date=None, end_date=None):
+        """
+        Sum the cells of a level over a date window.
+
+        Args:
+            level (str): 'ad_group', 'campaign' or 'customer'
+            start_date (str, optional): Start date in YYYY-MM-DD format. Defaults to the cube's start.
+            end_date (str, optional): End date in YYYY-MM-DD format. Defaults to the cube's end.
+
+        Returns:
+            list: One row per entity with an 'entity_id', its most recent
+                identity fields and the summed counters
+        """
+        start = to_date(start_date).isoformat() if start_date else self.start_date
+        end = to_date(end_date).isoformat() if end_date else self.end_date
+
+        totals = {}
+        for (day, entity_id), cell in self._cells[level].items():
+            if not start <= day <= end:
+                continue
+            entry = totals.get(entity_id)
+            if entry is None:
+                entry = totals[entity_id] = {'entity_id': entity_id, **self._identity[level][entity_id],
+                                             **dict.fromkeys(COUNTER_FIELDS, 0)}
+            for field in COUNTER_FIELDS:
+                entry[field] += cell[field]
+        return list(totals.values())
+
+    def stats(self):
+        """Get the cube's window, cell counts per level and age."""
+        return {
+            'customer_id': self.customer_id,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'cells': {level: len(cells) for level, cells in self._cells.items()},
+            'age_seconds': round(time.time() - self.built_at, 1)
+        }
+
+_cubes_lock = threading.Lock()
+_cubes = OrderedDict()
+
+FETCHERS = {
+    'campaign': fetch_campaign_days,
+    'ad_group': fetch_ad_group_days,
+}
+
+def _build_cube(client, customer_id, start_date, end_date):
+    store = get_daily_store()
+    # The levels are independent queries, so their syncs run concurrently; a failed
+    # sync raises inside its task and is reported per level
+    _, errors = run_concurrently({
+        level: partial(store.sync, customer_id, level, start_date, end_date,
+                       partial(FETCHERS[level], client, customer_id))
+        for level in SYNCED_LEVELS
+    })
+    if errors:
+        raise RuntimeError(f"Rollup cube sync failed for {start_date} to {end_date}: "
+                           + "; ".join(f"{level}: {error}" for level, error in errors.items()))
+    cube = RollupCube(customer_id, start_date, end_date,
+                      store.rows(customer_id, 'campaign', start_date, end_date),
+                      store.rows(customer_id, 'ad_group', start_date, end_date),
+                      version=store.version)
+    logger.info(f"Built rollup cube for {start_date} to {end_date}: {cube.stats()['cells']}")
+    return cube
+
+def get_rollup_cube(client, customer_id, start_date, end_date):
+    """
+    Get the rollup cube of a customer's date window, syncing missing days first.
+
+    A cube built earlier for this window, or for a wider window of the same
+    customer (e.g. one that includes the previous-period comparison), is
+    reused while it is younger than ROLLUP_CUBE_TTL and the daily store has
+    not synced new days since. Callers must therefore pass their window to
+    RollupCube.rollup. Concurrent callers for the same window share one sync
+    and build.
+
+    Args:
+        client (GoogleAdsClient): Google Ads API client
+        customer_id (str): Google Ads customer ID
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+
+    Returns:
+        RollupCube: Cube covering (at least) start_date to end_date
+
+    Raises:
+        Exception: Errors from the Google Ads query propagate to the caller
+    """
+    key = ('rollup_cube', str(customer_id), to_date(start_date).isoformat(), to_date(end_date).isoformat())
+    store = get_daily_store()
+
+    with _cubes_lock:
+        cube = _cubes.get(key)
+        if cube is None:
+            cube = next((candidate for candidate in reversed(_cubes.values())
+                         if candidate.customer_id == key[1] and candidate.covers(start_date, end_date)), None)
+        else:
+            _cubes.move_to_end(key)
+    # Hot days may be due for a re-sync even when the cube is young
+    if (cube is not None and cube.version == store.version and time.time() - cube.built_at < ROLLUP_CUBE_TTL
+            and not any(store.missing_ranges(customer_id, level, start_date, end_date) for level in SYNCED_LEVELS)):
+        return cube
+
+    cube = single_flight.do(key, lambda: _build_cube(client, customer_id, start_date, end_date))
+    with _cubes_lock:
+        _cubes[key] = cube
+        _cubes.move_to_end(key)
+        while len(_cubes) > ROLLUP_CUBE_MAX_CUBES:
+            _cubes.popitem(last=False)
+    return cube
+
+def purge_cubes():
+    """
+    Drop every cached cube (the daily store keeps its rows).
+
+    Returns:
+        int: Number of cubes removed
+    """
+    with _cubes_lock:
+        purged = len(_cubes)
+        _cubes.clear()
+    return purged
+
+def get_cube_stats():
+    """
+    Get the cached cubes, most recently used last.
+
+    Returns:
+        list: Per-cube window, cell counts and age
+    """
+    with _cubes_lock:
+        return [cube.stats() for cube in _cubes.values()]
@@ -17,6 +17,7 @@ Usage:
 import os
 import json
 import time
+import hashlib
 import logging
 import pathlib
 import webbrowser
@@ -30,6 +31,7 @@ from dotenv import load_dotenv
 import datetime
 from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
+from cache_backends import get_cache_backend
 
 # Configure logging
 logging.basicConfig(
@@ -49,6 +51,19 @@ SCOPES = [
     'https://www.googleapis.com/auth/analytics.edit'
 ]
 
+# Seconds a successful token verification is trusted. Verifications are kept in the
+# shared cache backend, so every worker (and the next restart) reuses them.
+try:
+    from config import TOKEN_VERIFICATION_TTL
+except ImportError:
+    TOKEN_VERIFICATION_TTL = 3600
+
+TOKEN_VERIFICATION_NAMESPACE = 'token_verification'
+
+def _token_cache_key(refresh_token):
+    """Identify a refresh token in the cache without storing the token itself."""
+    return hashlib.sha256(refresh_token.encode('utf-8')).hexdigest()
+
 # Global variables for the OAuth callback server
 authorization_code = None
 server_closed = threading.Event()
@@ -338,15 +353,14 @@ def should_refresh_token(force_refresh=False):
         logger.info("No refresh token found, will generate a new one")
         return True
     
-    # Check if we've recently verified the token's validity
+    # Check if this token was verified recently (by any worker)
     now = datetime.datetime.now()
-    if token_status['last_check']:
-        hours_since_check = (now - token_status['last_check']).total_seconds() / 3600
-        
-        # If we've checked recently and it was valid, don't check again
-        if hours_since_check < 1 and token_status['failed_checks'] == 0:
-            logger.info(f"Token was checked {hours_since_check:.2f} hours ago and was valid")
-            return False
+    cache_backend = get_cache_backend()
+    token_key = _token_cache_key(yaml_config['refresh_token'])
+    verified = cache_backend.get(TOKEN_VERIFICATION_NAMESPACE, token_key)
+    if verified:
+        logger.info(f"Token was verified at {verified['verified_at']} and was valid")
+        return False
     
     # Test if the current token is valid
     logger.info("Testing current refresh token validity...")
@@ -357,10 +371,13 @@ def should_refresh_token(force_refresh=False):
         logger.info("Refresh token is valid, no need to refresh")
         token_status['failed_checks'] = 0
         update_token_status(token_status)
+        cache_backend.set(TOKEN_VERIFICATION_NAMESPACE, token_key, {'verified_at': now.isoformat()},
+                          TOKEN_VERIFICATION_TTL)
         return False
     
     # Token is not valid, increment failed checks
     logger.warning("Refresh token is invalid or expired")
+    cache_backend.delete(TOKEN_VERIFICATION_NAMESPACE, token_key)
     token_status['failed_checks'] += 1
     update_token_status(token_status)
     
@@ -572,6 +589,13 @@ def verify_ads_token(force_refresh=False):
     success = update_yaml_config(yaml_config)
     
     if success:
+        # Pooled Google Ads clients still hold the old refresh token
+        try:
+            from google_ads_client import invalidate_google_ads_client
+            invalidate_google_ads_client()
+        except ImportError:
+            logger.warning("Could not import google_ads_client to invalidate pooled clients")
+        
         # Update token status
         token_status = load_token_status()
         token_status['last_refresh'] = datetime.datetime.now()